@@ -0,0 +1 @@
+document.getElementById("status").textContent = "已加载：" + new Date().toLocaleTimeString();
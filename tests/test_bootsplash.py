@@ -0,0 +1,50 @@
+import os, sys, shutil, tempfile, unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from webexe_engine import BuildEngine, BuildJob
+
+SPLASH_HTML = "<html><body style=\"background:#123\">Loading</body></html>"
+
+
+class BootSplashTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp(prefix="web2exe_test_")
+        self.splash_html = os.path.join(self.tmp, "splash.html")
+        with open(self.splash_html, "w", encoding="utf-8") as f:
+            f.write(SPLASH_HTML)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def job(self, boot_splash, use_webview=True):
+        return BuildJob("https://example.com", use_splash=True, splash_html=self.splash_html,
+                        boot_splash=boot_splash, use_webview=use_webview, output_dir=self.tmp)
+
+    def test_html_rendered_boot_splash_uses_bootloader_launcher(self):
+        for use_webview in (True, False):
+            job = self.job(True, use_webview)
+            self.assertTrue(job.has_boot_splash)
+            self.assertFalse(job.has_splash)
+            script = job.startup_script()
+            self.assertIn("pyi_splash.close()", script)
+            self.assertIn("_web2exe_boot_splash_timer.start()", script)
+            self.assertNotIn("_MEIPASS", script)
+            self.assertNotIn("import tkinter", script)
+
+    def test_html_splash_keeps_html_loader(self):
+        script = self.job(False).startup_script()
+        self.assertIn("_MEIPASS", script)
+        self.assertNotIn("pyi_splash", script)
+
+    def test_boot_splash_command_bundles_no_html(self):
+        engine = BuildEngine(data_dir=os.path.join(self.tmp, "data"), use_cache=False, log=lambda message: None)
+        image = os.path.join(self.tmp, "splash.png")
+        cmd = engine.build_command(self.job(True), self.tmp, os.path.join(self.tmp, "app.py"),
+                                   os.path.join(self.tmp, "dist"), boot_image=image)
+        self.assertEqual(cmd[cmd.index("--splash") + 1], image)
+        self.assertNotIn("--add-data", cmd)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,162 @@
+import os, sys, time, shutil, struct, tempfile, threading, unittest
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from webexe_engine import BuildEngine, BuildJob
+from webexe_preflight import IconCache, ICO_MAGIC, PNG_MAGIC, run_preflight
+
+TIMEOUT = 1.0
+PNG_ICON = PNG_MAGIC + struct.pack(">I", 13) + b"IHDR" + struct.pack(">II", 16, 16) + b"\x08\x06\x00\x00\x00"
+ICO_ICON = ICO_MAGIC + b"\x01\x00" + b"\x00" * 16
+
+
+class StandIn(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def send(self, status, body=b"", content_type="text/html", headers=()):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+        self.wfile.flush()
+
+    def do_GET(self):
+        host = self.headers.get("Host", "")
+        path = self.path.split("://", 1)[-1].split("/", 1)[-1] if "://" in self.path else self.path.lstrip("/")
+        if self.path.startswith("http://"):
+            self.server.proxied.append(self.path)
+        if path == "ok":
+            self.send(200, b'<html><head><link rel="icon" href="/static/icon.png"></head></html>')
+        elif path == "static/icon.png":
+            self.send(200, PNG_ICON, "image/png")
+        elif path == "plain":
+            self.send(200, b"<html><body>no icon link</body></html>")
+        elif path == "favicon.ico" and host.startswith("localhost"):
+            self.send(200, ICO_ICON, "image/x-icon")
+        elif path.startswith("hop"):
+            n = int(path[3:] or 0)
+            self.send(301, headers=[("Location", f"/hop{n + 1}" if n < 2 else "/ok")])
+        elif path == "slow":
+            time.sleep(TIMEOUT * 3)
+            self.send(200)
+        elif path == "held":
+            # Answers with a Content-Length but keeps the connection open, ignoring "Connection: close".
+            self.send(200, b"<html>held</html>")
+            time.sleep(TIMEOUT * 3)
+        else:
+            self.send(404, b"not found")
+
+
+class PreflightTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), StandIn)
+        cls.server.daemon_threads = True
+        cls.server.proxied = []
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.port = cls.server.server_address[1]
+        cls.base = f"http://127.0.0.1:{cls.port}"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        self.icons = tempfile.mkdtemp(prefix="web2exe_icons_")
+        patcher = mock.patch.dict(os.environ, {"no_proxy": "*", "NO_PROXY": "*"})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        shutil.rmtree(self.icons, ignore_errors=True)
+
+    def check(self, *paths, icons=False, base=None):
+        urls = [f"{base or self.base}/{path}" for path in paths]
+        cache = IconCache(self.icons) if icons else None
+        results = run_preflight(urls, TIMEOUT, urls if icons else (), cache)
+        return [results[url] for url in urls]
+
+    def preflight_jobs(self, *urls):
+        engine = BuildEngine(data_dir=self.icons, preflight_timeout=TIMEOUT, log=lambda message: None)
+        jobs = [BuildJob(url, index=idx, output_dir=self.icons, icon="app.ico") for idx, url in enumerate(urls)]
+        return engine.preflight_jobs(jobs)
+
+    def test_ok(self):
+        result, = self.check("ok")
+        self.assertTrue(result.ok)
+        self.assertEqual(result.status, 200)
+
+    def test_redirect_chain(self):
+        result, = self.check("hop0")
+        self.assertTrue(result.ok)
+        self.assertEqual(result.final_url, f"{self.base}/ok")
+
+    def test_not_found_is_fatal(self):
+        result, = self.check("missing")
+        self.assertFalse(result.ok)
+        self.assertTrue(result.fatal)
+        self.assertEqual(result.status, 404)
+
+    def test_timeout_is_a_warning(self):
+        started = time.time()
+        result, = self.check("slow")
+        self.assertLess(time.time() - started, TIMEOUT * 2.5)
+        self.assertFalse(result.ok)
+        self.assertFalse(result.fatal)
+
+    def test_connection_refused_rejects_job(self):
+        server = ThreadingHTTPServer(("127.0.0.1", 0), StandIn)
+        port = server.server_address[1]
+        server.server_close()
+        result, = self.check("ok", base=f"http://127.0.0.1:{port}")
+        self.assertFalse(result.ok)
+        self.assertTrue(result.fatal)
+        self.assertIn(0, self.preflight_jobs(f"http://127.0.0.1:{port}/ok"))
+
+    def test_unresolvable_host_rejects_job(self):
+        result, = self.check("ok", base="http://web2exe.invalid")
+        self.assertFalse(result.ok)
+        self.assertTrue(result.fatal)
+        self.assertIn(0, self.preflight_jobs("http://web2exe.invalid/ok"))
+
+    def test_timeout_still_builds(self):
+        self.assertEqual(self.preflight_jobs(f"{self.base}/slow"), {})
+
+    def test_body_stops_at_content_length(self):
+        started = time.time()
+        result, = self.check("held")
+        self.assertTrue(result.ok)
+        self.assertLess(time.time() - started, TIMEOUT * 2)
+
+    def test_icon_from_link_tag(self):
+        result, = self.check("ok", icons=True)
+        with open(result.icon, "rb") as f:
+            ico = f.read()
+        self.assertTrue(ico.startswith(ICO_MAGIC))
+        self.assertIn(PNG_ICON, ico)
+
+    def test_icon_from_favicon_fallback(self):
+        result, = self.check("plain", icons=True, base=f"http://localhost:{self.port}")
+        with open(result.icon, "rb") as f:
+            self.assertEqual(f.read(), ICO_ICON)
+
+    def test_requests_go_through_proxy(self):
+        proxy = {"http_proxy": self.base, "HTTP_PROXY": self.base, "no_proxy": "", "NO_PROXY": ""}
+        with mock.patch.dict(os.environ, proxy):
+            result, = self.check("hop0", base="http://web2exe.invalid")
+        self.assertTrue(result.ok)
+        self.assertEqual(result.final_url, "http://web2exe.invalid/ok")
+        self.assertIn("http://web2exe.invalid/hop0", self.server.proxied)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+import os, sys, shutil, tempfile, threading, unittest
+import urllib.request
+import urllib.error
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from webexe_bench import FIXTURES_DIR, serve_fixtures
+from webexe_launcher import SNAPSHOT_HELPER
+from webexe_snapshot import SNAPSHOT_FILENAME, build_snapshot
+
+FIXTURE_FILES = ["index.html", "style.css", "app.js", "logo.svg", "about.html"]
+
+
+def _get(url):
+    try:
+        with urllib.request.urlopen(url, timeout=10) as response:
+            return response.status, response.read()
+    except urllib.error.HTTPError as e:
+        return e.code, b""
+
+
+def _redirect_server(target):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def do_GET(self):
+            self.send_response(301)
+            self.send_header("Location", target)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def _start_launcher_server(snapshot_dir):
+    # Runs the snapshot server exactly as the generated launcher does, from the archive next to "__file__".
+    namespace = {"sys": sys, "os": os, "threading": threading, "_web2exe_mark": lambda event: None,
+                 "__file__": os.path.join(snapshot_dir, "web2exe_startup.py")}
+    exec(SNAPSHOT_HELPER, namespace)
+    return namespace["_web2exe_start_url"]("", False, 0)
+
+
+class SnapshotTest(unittest.TestCase):
+    def setUp(self):
+        self.fixtures = serve_fixtures()
+        self.origin = f"http://127.0.0.1:{self.fixtures.server_address[1]}"
+        self.tmp = tempfile.mkdtemp(prefix="web2exe_test_")
+        self.archive = os.path.join(self.tmp, SNAPSHOT_FILENAME)
+
+    def tearDown(self):
+        self.fixtures.shutdown()
+        self.fixtures.server_close()
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def assert_served(self, local_url):
+        base = local_url.rsplit("/", 1)[0]
+        for name in FIXTURE_FILES:
+            with open(os.path.join(FIXTURES_DIR, "assets", name), "rb") as f:
+                expected = f.read()
+            self.assertEqual(_get(f"{base}/{name}"), (200, expected), name)
+        self.assertEqual(_get(f"{base}/missing.png")[0], 404)
+
+    def test_crawled_fixture_is_served_by_launcher(self):
+        build_snapshot(f"{self.origin}/assets/index.html", self.archive)
+        local_url = _start_launcher_server(self.tmp)
+        self.assertTrue(local_url.endswith("/assets/index.html"))
+        self.assert_served(local_url)
+
+    def test_start_page_redirect_to_other_origin(self):
+        redirect = _redirect_server(f"{self.origin}/assets/index.html")
+        try:
+            build_snapshot(f"http://localhost:{redirect.server_address[1]}/", self.archive)
+        finally:
+            redirect.shutdown()
+            redirect.server_close()
+        self.assert_served(_start_launcher_server(self.tmp))
+
+    def test_bind_failure_raises_clear_error(self):
+        build_snapshot(f"{self.origin}/assets/index.html", self.archive)
+        refused = OSError(98, "Address already in use")
+        with mock.patch("http.server.ThreadingHTTPServer", side_effect=refused):
+            with self.assertRaisesRegex(OSError, "无法启动离线快照服务器.*Address already in use"):
+                _start_launcher_server(self.tmp)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,19 @@
+import os, sys, unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from webexe_splash import minify_css
+
+
+class MinifyCssTest(unittest.TestCase):
+    def test_descendant_pseudo_class_keeps_its_space(self):
+        self.assertEqual(minify_css("nav :hover { color: red; }"), "nav :hover{color:red}")
+        self.assertEqual(minify_css("a:hover { color: red; }"), "a:hover{color:red}")
+
+    def test_whitespace_and_comments_removed(self):
+        css = "/* splash */\nbody , p > span {\n  margin: 0 auto ;\n}\n@media (min-width: 600px) { p { x: y } }"
+        self.assertEqual(minify_css(css), "body,p>span{margin:0 auto}@media (min-width:600px){p{x:y}}")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+import os, sys, time, threading, unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from webexe_watch import Watcher
+
+DEBOUNCE = 0.1
+SLOW_CANCEL = 1.0
+
+
+class StandInJob:
+    icon = splash_image = ""
+    has_splash = has_boot_splash = False
+    package_mode = "onefile"
+
+    def __init__(self, url, index=0):
+        self.urls = [url]
+        self.title = url
+        self.index = index
+
+    def to_dict(self):
+        return {"urls": self.urls}
+
+
+class StandInResult:
+    def __init__(self, job):
+        self.job = job
+        self.success = True
+        self.artifact = ""
+
+
+class StandInEngine:
+    # Builds block until cancelled; cancel() is as slow as taskkill can be.
+    preflight = False
+
+    def __init__(self):
+        self.started = threading.Event()
+        self.cancelled = threading.Event()
+        self.cancel_threads = []
+
+    def log(self, message):
+        pass
+
+    def template_eligible(self, job):
+        return False
+
+    def run(self, jobs, plan=None):
+        self.started.set()
+        self.cancelled.wait()
+        return [StandInResult(job) for job in jobs]
+
+    def cancel(self):
+        self.cancel_threads.append(threading.current_thread())
+        time.sleep(SLOW_CANCEL)
+        self.cancelled.set()
+
+
+def poll(watcher, jobs, seconds):
+    deadline = time.time() + seconds
+    while time.time() < deadline:
+        started = time.time()
+        watcher.update(jobs)
+        if time.time() - started > 0.05:
+            return False
+        time.sleep(0.02)
+    return True
+
+
+class WatcherTest(unittest.TestCase):
+    def setUp(self):
+        self.engine = StandInEngine()
+        self.watcher = Watcher(self.engine, DEBOUNCE)
+        self.addCleanup(self.watcher.stop)
+
+    def test_update_does_not_block_on_cancel(self):
+        self.assertTrue(poll(self.watcher, [StandInJob("https://a.example")], DEBOUNCE * 4))
+        self.assertTrue(self.engine.started.wait(2))
+        self.assertTrue(poll(self.watcher, [StandInJob("https://b.example")], DEBOUNCE * 4))
+        self.assertTrue(self.engine.cancelled.wait(SLOW_CANCEL * 2))
+        self.assertNotIn(threading.current_thread(), self.engine.cancel_threads)
+
+    def test_stop_cancels_off_the_caller_thread(self):
+        poll(self.watcher, [StandInJob("https://a.example")], DEBOUNCE * 4)
+        self.assertTrue(self.engine.started.wait(2))
+        started = time.time()
+        self.watcher.stop(wait=False)
+        self.assertLess(time.time() - started, 0.05)
+        self.assertTrue(self.engine.cancelled.wait(SLOW_CANCEL * 2))
+        self.assertNotIn(threading.current_thread(), self.engine.cancel_threads)
+
+
+if __name__ == "__main__":
+    unittest.main()
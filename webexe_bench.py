@@ -0,0 +1,334 @@
+import os, sys, re, json, shutil, tempfile, subprocess, threading, platform
+import time
+import argparse
+import functools
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+
+from webexe_engine import BuildEngine, BuildJob, PACKAGE_MODES, default_max_workers
+from webexe_logbus import LogBus, LOG_TICK_MS
+from webexe_stub_pyinstaller import DEFAULT_PHASES
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+STUB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "webexe_stub_pyinstaller.py")
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bench_fixtures")
+DEFAULT_SIZES = [1, 10, 100, 1000]
+OWN_PHASES = ("prepare", "cache", "post", "padding", "finish")
+LINE_TIME = re.compile(r"t=(\d+\.\d+)$")
+HEARTBEAT_MS = 20
+
+
+def peak_rss_mb():
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+    try:
+        import psutil
+    except ImportError:
+        return None
+    return round(psutil.Process().memory_info().peak_wset / (1024 * 1024), 1)
+
+
+def percentiles(samples):
+    if not samples:
+        return None
+    samples = sorted(samples)
+    pick = lambda q: samples[min(len(samples) - 1, int(q * len(samples)))]
+    return {"p50": round(pick(0.5), 4), "p95": round(pick(0.95), 4), "max": round(samples[-1], 4), "count": len(samples)}
+
+
+class LatencyProbe:
+    def __init__(self):
+        self.samples = []
+
+    def lines(self, lines):
+        now = time.time()
+        for line in lines:
+            match = LINE_TIME.search(line)
+            if match:
+                self.samples.append(now - float(match.group(1)))
+
+
+def drain_loop(bus, probe, stop):
+    while not stop.is_set():
+        lines, _, calls = bus.drain()
+        probe.lines(lines)
+        for func, args in calls:
+            func(*args)
+        time.sleep(LOG_TICK_MS / 1000)
+    probe.lines(bus.drain()[0])
+
+
+def stub_jobs(count, output_dir, mode, padding_mb):
+    return [BuildJob(f"https://example.com/{i}", title=f"bench{i:04}", use_webview=False, package_mode=mode,
+                     increase_volume=padding_mb > 0, padding_mb=padding_mb or 1, output_dir=output_dir, index=i)
+            for i in range(count)]
+
+
+def run_stub_batch(count, workers, phases=DEFAULT_PHASES, lines=400, size_mb=8, padding_mb=0, mode="onefile",
+                   use_tk=False):
+    work_dir = tempfile.mkdtemp(prefix="web2exe_bench_")
+    bus = LogBus()
+    probe = LatencyProbe()
+    pyinstaller = [sys.executable, STUB_PATH, "--stub-lines", str(lines), "--stub-phases", phases,
+                   "--stub-size-mb", str(size_mb)]
+    engine = BuildEngine(max_workers=workers, pyinstaller=pyinstaller, log=bus.log, use_cache=False,
+                         data_dir=os.path.join(work_dir, "data"), padding_fill="random")
+    jobs = stub_jobs(count, os.path.join(work_dir, "out"), mode, padding_mb)
+    try:
+        started = time.time()
+        if use_tk:
+            results, tk_stats = _run_with_tk(engine, jobs, bus, probe)
+        else:
+            stop = threading.Event()
+            drainer = threading.Thread(target=drain_loop, args=(bus, probe, stop), daemon=True)
+            drainer.start()
+            results = engine.run(jobs)
+            stop.set()
+            drainer.join()
+            tk_stats = None
+        wall = time.time() - started
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    own = {phase: percentiles([r.phases[phase] for r in results if phase in r.phases]) for phase in OWN_PHASES}
+    return {
+        "jobs": count,
+        "workers": workers,
+        "mode": mode,
+        "padding_mb": padding_mb,
+        "succeeded": sum(1 for r in results if r.success),
+        "wall": round(wall, 3),
+        "throughput": round(count / wall, 3) if wall else None,
+        "job_elapsed": percentiles([r.elapsed for r in results]),
+        "own_phases": {phase: stats for phase, stats in own.items() if stats},
+        "log_latency": percentiles(probe.samples),
+        "tk_lateness": tk_stats,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def _run_with_tk(engine, jobs, bus, probe):
+    import tkinter as tk
+    from webexe_v9 import Web2ExeApp
+
+    root = tk.Tk()
+    root.withdraw()
+    app = Web2ExeApp(root)
+    app.log_bus = bus
+    append_log_lines = app.append_log_lines
+
+    def append_and_measure(lines):
+        probe.lines(lines)
+        append_log_lines(lines)
+
+    app.append_log_lines = append_and_measure
+    lateness = []
+    state = {"results": [], "expected": None}
+
+    def heartbeat():
+        now = time.perf_counter()
+        if state["expected"] is not None:
+            lateness.append(max(0.0, now - state["expected"]))
+        state["expected"] = now + HEARTBEAT_MS / 1000
+        root.after(HEARTBEAT_MS, heartbeat)
+
+    def worker():
+        state["results"] = engine.run(jobs)
+        bus.call(root.after, LOG_TICK_MS * 3, root.quit)
+
+    root.after(HEARTBEAT_MS, heartbeat)
+    threading.Thread(target=worker, daemon=True).start()
+    root.mainloop()
+    root.destroy()
+    return state["results"], percentiles(lateness)
+
+
+def stub_suite(sizes, workers, args):
+    report = []
+    for count in sizes:
+        cmd = [sys.executable, os.path.abspath(__file__), "stub-one", str(count), "-j", str(workers),
+               "--phases", args.phases, "--lines", str(args.lines), "--size-mb", str(args.size_mb),
+               "--padding-mb", str(args.padding_mb), "--mode", args.mode]
+        if args.tk:
+            cmd.append("--tk")
+        output = subprocess.run(cmd, stdout=subprocess.PIPE, text=True, check=True).stdout
+        report.append(json.loads(output.strip().splitlines()[-1]))
+        print(format_stub_row(report[-1]), flush=True)
+    return report
+
+
+def format_stub_row(row):
+    latency = row["log_latency"] or {}
+    tk_stats = row["tk_lateness"] or {}
+    own = sum(stats["p50"] for stats in row["own_phases"].values())
+    line = (f"{row['jobs']:>5} 个任务  并行 {row['workers']:<3} 用时 {row['wall']:>8.2f}s  "
+            f"吞吐 {row['throughput']:>7.2f}/s  自身开销 p50 {own:.3f}s  "
+            f"日志延迟 p95 {latency.get('p95', 0) * 1000:.0f}ms  峰值内存 {row['peak_rss_mb']} MB")
+    if tk_stats:
+        line += f"  界面卡顿 p95 {tk_stats['p95'] * 1000:.0f}ms max {tk_stats['max'] * 1000:.0f}ms"
+    return line
+
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+def serve_fixtures(root=FIXTURES_DIR):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), functools.partial(_QuietHandler, directory=root))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def fixture_sites(root=FIXTURES_DIR):
+    return sorted(name for name in os.listdir(root) if os.path.isfile(os.path.join(root, name, "index.html")))
+
+
+def real_suite(args):
+    from webexe_timing import measure_startup
+
+    server = serve_fixtures()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    work_dir = tempfile.mkdtemp(prefix="web2exe_bench_real_")
+    try:
+        jobs = []
+        for site in fixture_sites():
+            for mode in args.modes:
+                jobs.append(BuildJob(f"{base_url}/{site}/", title=f"bench-{site}-{mode}", use_webview=not args.browser,
+                                     package_mode=mode, output_dir=os.path.join(work_dir, "out"), index=len(jobs)))
+        engine = BuildEngine(max_workers=args.workers, use_cache=False, slim=args.slim,
+                             data_dir=os.path.join(work_dir, "data"), log=lambda message: None)
+        started = time.time()
+        results = engine.run(jobs)
+        wall = time.time() - started
+
+        rows = []
+        for result in results:
+            row = {"name": result.job.name, "mode": result.job.package_mode, "success": result.success,
+                   "elapsed": round(result.elapsed, 3), "phases": result.phases, "error": result.error}
+            if result.success:
+                row["size_mb"] = round(_artifact_size(result.artifact) / (1024 * 1024), 2)
+                if args.startup:
+                    startup = measure_startup(engine.main_executable(result.job, result.artifact), args.runs)
+                    row["startup"] = {"cold": startup["cold"], "warm": startup["warm"]}
+            rows.append(row)
+            print(format_real_row(row), flush=True)
+        return {"wall": round(wall, 3), "tool": engine.tool_version(), "jobs": rows}
+    finally:
+        server.shutdown()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def _artifact_size(path):
+    if not os.path.isdir(path):
+        return os.path.getsize(path)
+    return sum(os.path.getsize(os.path.join(d, f)) for d, _, files in os.walk(path) for f in files)
+
+
+def format_real_row(row):
+    if not row["success"]:
+        return f"{row['name']:<32} 失败: {row['error']}"
+    phases = ", ".join(f"{name} {seconds:.1f}s" for name, seconds in row["phases"].items())
+    line = f"{row['name']:<32} {row['elapsed']:>7.2f}s  {row['size_mb']:>7.2f} MB  ({phases})"
+    if "startup" in row:
+        line += f"  冷启动 {row['startup']['cold']}s 热启动 {row['startup']['warm']}s"
+    return line
+
+
+def compare_reports(old, new):
+    lines = []
+    if old.get("kind") == "stub" and new.get("kind") == "stub":
+        old_rows = {row["jobs"]: row for row in old["results"]}
+        for row in new["results"]:
+            before = old_rows.get(row["jobs"])
+            if before:
+                lines.append(f"{row['jobs']:>5} 个任务  吞吐 {before['throughput']:.2f} -> {row['throughput']:.2f}/s  "
+                             f"用时 {before['wall']:.2f} -> {row['wall']:.2f}s  "
+                             f"峰值内存 {before['peak_rss_mb']} -> {row['peak_rss_mb']} MB")
+    elif old.get("kind") == "real" and new.get("kind") == "real":
+        old_rows = {row["name"]: row for row in old["results"]["jobs"]}
+        for row in new["results"]["jobs"]:
+            before = old_rows.get(row["name"])
+            if before and before["success"] and row["success"]:
+                lines.append(f"{row['name']:<32} 用时 {before['elapsed']:.2f} -> {row['elapsed']:.2f}s  "
+                             f"大小 {before['size_mb']:.2f} -> {row['size_mb']:.2f} MB")
+    else:
+        lines.append("两个报告的类型不同，无法比较")
+    return "\n".join(lines)
+
+
+def write_report(path, kind, results):
+    report = {
+        "kind": kind,
+        "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "platform": platform.platform(),
+        "python": sys.version.split()[0],
+        "results": results,
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Web2EXE 打包流程基准测试")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    def add_stub_options(p):
+        p.add_argument("-j", "--workers", type=int, default=default_max_workers())
+        p.add_argument("--phases", default=DEFAULT_PHASES, help="替身各阶段耗时，如 analysis=1.0:cpu,pkg=0.5")
+        p.add_argument("--lines", type=int, default=400, help="每个任务输出的日志行数")
+        p.add_argument("--size-mb", type=float, default=8, help="替身生成的程序大小")
+        p.add_argument("--padding-mb", type=int, default=0, help="每个任务追加的填充大小，0 表示不追加")
+        p.add_argument("--mode", choices=PACKAGE_MODES, default="onefile")
+        p.add_argument("--tk", action="store_true", help="通过真实界面的日志窗口测量界面响应")
+
+    stub = sub.add_parser("stub", help="用 PyInstaller 替身测量调度、日志、界面、临时文件和内存开销")
+    stub.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    stub.add_argument("--report")
+    add_stub_options(stub)
+
+    stub_one = sub.add_parser("stub-one")
+    stub_one.add_argument("count", type=int)
+    add_stub_options(stub_one)
+
+    real = sub.add_parser("real", help="用真实 PyInstaller 打包 bench_fixtures 中的测试网站")
+    real.add_argument("-j", "--workers", type=int, default=default_max_workers())
+    real.add_argument("--modes", nargs="+", choices=PACKAGE_MODES, default=["onefile"])
+    real.add_argument("--browser", action="store_true")
+    real.add_argument("--slim", action="store_true")
+    real.add_argument("--startup", action="store_true", help="同时测量冷/热启动时间")
+    real.add_argument("--runs", type=int, default=3)
+    real.add_argument("--report")
+
+    compare = sub.add_parser("compare", help="比较两次基准测试报告")
+    compare.add_argument("old")
+    compare.add_argument("new")
+
+    args = parser.parse_args(argv)
+    if args.command == "stub-one":
+        row = run_stub_batch(args.count, args.workers, args.phases, args.lines, args.size_mb, args.padding_mb,
+                             args.mode, args.tk)
+        print(json.dumps(row, ensure_ascii=False))
+    elif args.command == "stub":
+        results = stub_suite(args.sizes, args.workers, args)
+        if args.report:
+            write_report(args.report, "stub", results)
+    elif args.command == "real":
+        results = real_suite(args)
+        if args.report:
+            write_report(args.report, "real", results)
+    else:
+        with open(args.old, encoding="utf-8") as f:
+            old = json.load(f)
+        with open(args.new, encoding="utf-8") as f:
+            new = json.load(f)
+        print(compare_reports(old, new))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
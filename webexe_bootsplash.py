@@ -0,0 +1,69 @@
+import os, sys, shutil, hashlib, tempfile, subprocess
+from pathlib import Path
+
+# Images for PyInstaller's bootloader splash (--splash). The bootloader shows it before the onefile archive is
+# unpacked, so it appears far earlier than the HTML splash, which needs Python, tkinter and webview first.
+# An HTML splash page is turned into an image once with a headless Edge/Chrome screenshot and cached.
+
+BOOT_SPLASH_SIZE = (500, 300)
+RENDER_TIMEOUT = 60
+BROWSER_NAMES = ("msedge", "chrome", "chromium", "chromium-browser", "google-chrome", "microsoft-edge")
+
+
+def boot_splash_supported():
+    return sys.platform != "darwin"
+
+
+def find_browser():
+    if os.environ.get("WEB2EXE_BROWSER"):
+        return os.environ["WEB2EXE_BROWSER"]
+    if sys.platform == "win32":
+        for base in filter(None, (os.environ.get("ProgramFiles(x86)"), os.environ.get("ProgramFiles"),
+                                  os.environ.get("LOCALAPPDATA"))):
+            for candidate in (os.path.join(base, "Microsoft", "Edge", "Application", "msedge.exe"),
+                              os.path.join(base, "Google", "Chrome", "Application", "chrome.exe")):
+                if os.path.isfile(candidate):
+                    return candidate
+    for name in BROWSER_NAMES:
+        found = shutil.which(name)
+        if found:
+            return found
+    return None
+
+
+def render_html(html_path, png_path, size=BOOT_SPLASH_SIZE, browser=None):
+    browser = browser or find_browser()
+    if not browser:
+        raise RuntimeError("未找到 Edge 或 Chrome，无法把启动页渲染为图片。请设置 WEB2EXE_BROWSER 或直接使用图片作为启动画面")
+    with tempfile.TemporaryDirectory(prefix="web2exe_render_") as profile:
+        cmd = [browser, "--headless", "--disable-gpu", "--hide-scrollbars", "--no-first-run",
+               f"--user-data-dir={profile}", f"--window-size={size[0]},{size[1]}", f"--screenshot={png_path}",
+               Path(os.path.abspath(html_path)).as_uri()]
+        try:
+            subprocess.run(cmd, capture_output=True, timeout=RENDER_TIMEOUT)
+        except (OSError, subprocess.SubprocessError) as e:
+            raise RuntimeError(f"渲染启动页失败: {e}")
+    if not os.path.isfile(png_path) or not os.path.getsize(png_path):
+        raise RuntimeError("渲染启动页失败：浏览器没有生成截图")
+    return png_path
+
+
+def boot_splash_image(splash_image, splash_dir, splash_html, cache_dir, log=None):
+    if splash_image:
+        return os.path.abspath(splash_image)
+    # splash_dir is a content-addressed bundle, so its name already identifies the rendered result.
+    key = hashlib.sha256(f"{os.path.basename(splash_dir)}:{BOOT_SPLASH_SIZE}".encode()).hexdigest()[:24]
+    png_path = os.path.join(cache_dir, key + ".png")
+    if os.path.isfile(png_path):
+        return png_path
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_path = os.path.join(cache_dir, f"{key}.{os.getpid()}.png")
+    try:
+        render_html(os.path.join(splash_dir, os.path.basename(splash_html)), tmp_path)
+        os.replace(tmp_path, png_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    if log:
+        log(f"已将启动页渲染为启动画面图片: {png_path}")
+    return png_path
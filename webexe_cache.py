@@ -0,0 +1,160 @@
+import os, json, shutil, hashlib, threading
+import time
+from collections import Counter
+
+DEFAULT_CACHE_SIZE_MB = 2048
+HASH_BUFFER_SIZE = 1024 * 1024
+
+
+def hash_file(digest, path):
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_BUFFER_SIZE), b""):
+            digest.update(chunk)
+
+
+def hash_tree(digest, root):
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for filename in sorted(filenames):
+            full_path = os.path.join(dirpath, filename)
+            digest.update(os.path.relpath(full_path, root).replace(os.sep, "/").encode("utf-8") + b"\0")
+            hash_file(digest, full_path)
+
+
+def _copy_artifact(src, dst):
+    if os.path.isdir(src):
+        shutil.copytree(src, dst, symlinks=True)
+    else:
+        shutil.copyfile(src, dst)
+        shutil.copymode(src, dst)
+
+
+def _remove_path(path):
+    if os.path.isdir(path) and not os.path.islink(path):
+        shutil.rmtree(path, ignore_errors=True)
+    elif os.path.lexists(path):
+        os.remove(path)
+
+
+def _path_size(path):
+    if not os.path.isdir(path):
+        return os.path.getsize(path)
+    total = 0
+    for dirpath, dirnames, filenames in os.walk(path):
+        for filename in filenames:
+            total += os.lstat(os.path.join(dirpath, filename)).st_size
+    return total
+
+
+def normalize_command(cmd, replacements):
+    normalized = []
+    for arg in cmd:
+        for old, new in replacements:
+            if old:
+                arg = arg.replace(old, new)
+        normalized.append(arg)
+    return normalized
+
+
+class BuildCache:
+    def __init__(self, cache_dir, max_size_mb=DEFAULT_CACHE_SIZE_MB, log=None):
+        self.cache_dir = cache_dir
+        self.max_bytes = int(max_size_mb * 1024 * 1024)
+        self.log = log or (lambda message: None)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._pinned = Counter()
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def make_key(self, script, cmd, tool_version, files=(), trees=()):
+        digest = hashlib.sha256()
+        digest.update(json.dumps({"cmd": cmd, "tool": tool_version}, sort_keys=True).encode("utf-8"))
+        digest.update(b"\0script\0" + script.encode("utf-8"))
+        for path in files:
+            if path and os.path.isfile(path):
+                digest.update(b"\0file\0")
+                hash_file(digest, path)
+        for path in trees:
+            if path and os.path.isdir(path):
+                digest.update(b"\0tree\0")
+                hash_tree(digest, path)
+        return digest.hexdigest()
+
+    def _entry_path(self, key):
+        return os.path.join(self.cache_dir, key[:2], key)
+
+    def fetch(self, key, dest_path):
+        entry = self._entry_path(key)
+        artifact = os.path.join(entry, "artifact")
+        with self._lock:
+            if not os.path.exists(artifact):
+                self.misses += 1
+                return False
+            self.hits += 1
+            now = time.time()
+            os.utime(artifact, (now, now))
+            # Pinned entries are skipped by evict() and not replaced by store() while the copy runs.
+            self._pinned[key] += 1
+
+        tmp_path = dest_path + ".web2exe-tmp"
+        try:
+            _copy_artifact(artifact, tmp_path)
+            _remove_path(dest_path)
+            os.replace(tmp_path, dest_path)
+        finally:
+            _remove_path(tmp_path)
+            with self._lock:
+                self._pinned[key] -= 1
+                if not self._pinned[key]:
+                    del self._pinned[key]
+        return True
+
+    def store(self, key, artifact_path, meta=None):
+        entry = self._entry_path(key)
+        tmp_entry = entry + f".tmp-{os.getpid()}-{threading.get_ident()}"
+        try:
+            os.makedirs(tmp_entry, exist_ok=True)
+            _copy_artifact(artifact_path, os.path.join(tmp_entry, "artifact"))
+            with open(os.path.join(tmp_entry, "meta.json"), "w", encoding="utf-8") as f:
+                json.dump(dict(meta or {}, stored=time.time()), f, ensure_ascii=False)
+            with self._lock:
+                if key not in self._pinned:
+                    if os.path.exists(entry):
+                        shutil.rmtree(entry, ignore_errors=True)
+                    os.replace(tmp_entry, entry)
+        finally:
+            shutil.rmtree(tmp_entry, ignore_errors=True)
+        self.evict()
+
+    def entries(self):
+        result = []
+        for prefix in os.listdir(self.cache_dir):
+            prefix_dir = os.path.join(self.cache_dir, prefix)
+            if not os.path.isdir(prefix_dir):
+                continue
+            for key in os.listdir(prefix_dir):
+                artifact = os.path.join(prefix_dir, key, "artifact")
+                try:
+                    st = os.stat(artifact)
+                except OSError:
+                    continue
+                result.append((st.st_mtime, _path_size(artifact), key))
+        return result
+
+    def size(self):
+        return sum(size for _, size, _ in self.entries())
+
+    def evict(self):
+        with self._lock:
+            entries = sorted(self.entries())
+            total = sum(size for _, size, _ in entries)
+            entries = [entry for entry in entries if entry[2] not in self._pinned]
+            while entries and total > self.max_bytes:
+                _, size, key = entries.pop(0)
+                shutil.rmtree(self._entry_path(key), ignore_errors=True)
+                total -= size
+                self.log(f"构建缓存已淘汰: {key[:12]} ({size / (1024 * 1024):.1f} MB)")
+
+    def report(self):
+        return f"构建缓存：命中 {self.hits}，未命中 {self.misses}，占用 {self.size() / (1024 * 1024):.1f} MB / {self.max_bytes / (1024 * 1024):.0f} MB"
@@ -0,0 +1,168 @@
+import os, sys, json, zlib, shutil, tempfile
+import argparse
+import shlex
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_PYZ_LEVEL = 6
+DEFAULT_PKG_LEVEL = 9
+TRANSFER_LEVEL = 6
+READ_BUFFER_SIZE = 1024 * 1024
+
+# Runs PyInstaller with the PYZ/PKG zlib levels patched; used when builds are not going through a pool worker.
+LEVELS_WRAPPER = (
+    "import sys\n"
+    "from PyInstaller.archive.writers import ZlibArchiveWriter, CArchiveWriter\n"
+    "ZlibArchiveWriter._COMPRESSION_LEVEL = int(sys.argv[1])\n"
+    "CArchiveWriter._COMPRESSION_LEVEL = int(sys.argv[2])\n"
+    "import PyInstaller.__main__\n"
+    "PyInstaller.__main__.run(sys.argv[3:])\n"
+)
+
+
+class CompressionProfile:
+    def __init__(self, name, upx=None, pyz_level=DEFAULT_PYZ_LEVEL, pkg_level=DEFAULT_PKG_LEVEL, padding_fill=None,
+                 description=""):
+        self.name = name
+        self.upx = upx
+        self.pyz_level = pyz_level
+        self.pkg_level = pkg_level
+        self.padding_fill = padding_fill
+        self.description = description
+
+    @property
+    def levels(self):
+        if (self.pyz_level, self.pkg_level) == (DEFAULT_PYZ_LEVEL, DEFAULT_PKG_LEVEL):
+            return None
+        return [self.pyz_level, self.pkg_level]
+
+    def pyinstaller_args(self):
+        return ["--noupx"] if self.upx == "off" else []
+
+    def env(self):
+        # UPX reads its default options from the UPX environment variable, so levels reach the upx calls
+        # PyInstaller makes without touching PyInstaller itself.
+        return {"UPX": self.upx} if self.upx and self.upx != "off" else {}
+
+    def key_args(self):
+        return [f"--web2exe-compression={json.dumps(self.to_dict(), sort_keys=True)}"]
+
+    def to_dict(self):
+        return {"name": self.name, "upx": self.upx, "pyz_level": self.pyz_level, "pkg_level": self.pkg_level,
+                "padding_fill": self.padding_fill}
+
+
+COMPRESSION_PROFILES = {
+    "default": CompressionProfile("default", description="PyInstaller 默认设置（PATH 中有 UPX 时使用 UPX）"),
+    "none": CompressionProfile("none", upx="off", pyz_level=0, pkg_level=0, description="不压缩：体积最大，解压最快"),
+    "fast": CompressionProfile("fast", upx="off", pyz_level=1, pkg_level=1, description="快速压缩：适合磁盘慢、CPU 快的机器"),
+    "small": CompressionProfile("small", upx="--best --lzma", pyz_level=9, pkg_level=9, padding_fill="zero",
+                                description="最小体积：UPX 最高压缩，填充使用可压缩的零数据，适合网络慢的用户下载"),
+}
+
+
+def get_profile(name):
+    if name not in COMPRESSION_PROFILES:
+        raise ValueError(f"未知的压缩方案: {name}")
+    return COMPRESSION_PROFILES[name]
+
+
+def wrap_command(python, args, levels):
+    return [python, "-c", LEVELS_WRAPPER, str(levels[0]), str(levels[1])] + list(args)
+
+
+def transfer_size(path, level=TRANSFER_LEVEL):
+    # Approximates the download size when the output is shipped in a zip.
+    paths = [path]
+    if os.path.isdir(path):
+        paths = [os.path.join(d, f) for d, _, files in os.walk(path) for f in sorted(files)]
+    total = 0
+    for file_path in paths:
+        compressor = zlib.compressobj(level)
+        with open(file_path, "rb") as f:
+            for chunk in iter(lambda: f.read(READ_BUFFER_SIZE), b""):
+                total += len(compressor.compress(chunk))
+        total += len(compressor.flush())
+    return total
+
+
+def artifact_size(path):
+    if not os.path.isdir(path):
+        return os.path.getsize(path)
+    return sum(os.path.getsize(os.path.join(d, f)) for d, _, files in os.walk(path) for f in files)
+
+
+def analyze_outputs(artifacts, workers=None):
+    def analyze(item):
+        name, path = item
+        return name, {"size": artifact_size(path), "transfer_size": transfer_size(path)}
+
+    with ThreadPoolExecutor(max_workers=workers or min(8, os.cpu_count() or 1)) as pool:
+        return dict(pool.map(analyze, artifacts.items()))
+
+
+def compare_profiles(url, output_dir, profiles, runs=3, use_webview=True, pyinstaller=None, mode="onefile",
+                     increase_volume=False, log=print):
+    from webexe_engine import BuildEngine, BuildJob
+    from webexe_timing import measure_startup
+
+    jobs = [BuildJob(url, title=f"web2exe-compress-{name}", use_webview=use_webview, package_mode=mode,
+                     increase_volume=increase_volume, output_dir=output_dir, compression=name, index=idx)
+            for idx, name in enumerate(profiles)]
+    engine = BuildEngine(pyinstaller=pyinstaller, use_cache=False, log=log)
+    results = {result.job.compression: result for result in engine.run(jobs)}
+
+    built = {name: result.artifact for name, result in results.items() if result.success}
+    report = {name: {"error": result.error} for name, result in results.items() if not result.success}
+    for name, stats in analyze_outputs(built).items():
+        result = results[name]
+        log(f"正在测量 {name} 的启动时间")
+        startup = measure_startup(engine.main_executable(result.job, result.artifact), runs)
+        report[name] = dict(stats, build_time=round(result.elapsed, 3), cold=startup["cold"], warm=startup["warm"])
+    return {name: report[name] for name in profiles}
+
+
+def _mb(size):
+    return f"{size / (1024 * 1024):.2f}"
+
+
+def format_report(report):
+    lines = [f"{'压缩方案':<10}{'大小 (MB)':>12}{'下载大小 (MB)':>16}{'打包 (s)':>10}{'冷启动 (s)':>12}{'热启动 (s)':>12}"]
+    for name, stats in report.items():
+        if "error" in stats:
+            lines.append(f"{name:<10}失败: {stats['error']}")
+            continue
+        cold = "-" if stats["cold"] is None else f"{stats['cold']:.3f}"
+        warm = "-" if stats["warm"] is None else f"{stats['warm']:.3f}"
+        lines.append(f"{name:<10}{_mb(stats['size']):>12}{_mb(stats['transfer_size']):>16}"
+                     f"{stats['build_time']:>10.1f}{cold:>12}{warm:>12}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="用不同压缩方案打包同一网址，比较体积、下载大小和启动时间")
+    parser.add_argument("url")
+    parser.add_argument("-o", "--output", help="输出目录，默认使用临时目录")
+    parser.add_argument("--profiles", nargs="+", choices=list(COMPRESSION_PROFILES), default=list(COMPRESSION_PROFILES))
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--browser", action="store_true")
+    parser.add_argument("--mode", default="onefile")
+    parser.add_argument("--increase-volume", action="store_true")
+    parser.add_argument("--pyinstaller", default=None)
+    parser.add_argument("--report", help="将完整结果写入 JSON 文件")
+    args = parser.parse_args(argv)
+
+    output_dir = args.output or tempfile.mkdtemp(prefix="web2exe_compress_")
+    pyinstaller = shlex.split(args.pyinstaller) if args.pyinstaller else None
+    report = compare_profiles(args.url, output_dir, args.profiles, args.runs, not args.browser, pyinstaller,
+                              args.mode, args.increase_volume)
+    print(format_report(report))
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    if not args.output:
+        shutil.rmtree(output_dir, ignore_errors=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,254 @@
+import os, sys, json, zlib, shutil, struct, hashlib
+import time
+import argparse
+
+# Binary delta packages between two builds of the same app. Both files are cut into content-defined chunks
+# (a boundary after each occurrence of MARKER, bounded by MIN_CHUNK/MAX_CHUNK), so an edit only changes the
+# chunks around it and the rest line up again. New chunks already present in the old file become copy
+# operations; everything else is stored zlib-compressed. Both sides are streamed, memory stays at a few MB
+# plus the chunk index. Only the standard library is used so the apply side can ship on its own.
+
+DELTA_MAGIC = b"W2XDELTA1\n"
+DELTA_FORMAT = 1
+MARKER = b"\x9e\x37"
+MIN_CHUNK = 16 * 1024
+MAX_CHUNK = 256 * 1024
+READ_BLOCK = 4 * 1024 * 1024
+COPY_OP = b"C"
+DATA_OP = b"D"
+OP_HEADER = struct.Struct("<cQQ")
+
+
+def iter_chunks(path):
+    with open(path, "rb") as f:
+        buf = b""
+        pos = 0
+        offset = 0
+        eof = False
+        while True:
+            if len(buf) - pos < MAX_CHUNK and not eof:
+                more = f.read(READ_BLOCK)
+                eof = not more
+                buf = buf[pos:] + more
+                pos = 0
+                continue
+            if pos >= len(buf):
+                return
+            cut = buf.find(MARKER, pos + MIN_CHUNK, pos + MAX_CHUNK)
+            end = cut + len(MARKER) if cut >= 0 else min(pos + MAX_CHUNK, len(buf))
+            yield offset, memoryview(buf)[pos:end]
+            offset += end - pos
+            pos = end
+
+
+def chunk_key(chunk):
+    return hashlib.blake2b(chunk, digest_size=16).digest()
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(READ_BLOCK), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def index_file(path):
+    index = {}
+    digest = hashlib.sha256()
+    size = 0
+    for offset, chunk in iter_chunks(path):
+        digest.update(chunk)
+        index.setdefault(chunk_key(chunk), (offset, len(chunk)))
+        size += len(chunk)
+    return index, digest.hexdigest(), size
+
+
+def make_delta(old_path, new_path, delta_path, log=None, old_info=None, new_info=None):
+    started = time.time()
+    index, old_sha, old_size = index_file(old_path)
+    new_digest = hashlib.sha256()
+    new_size = copied = literal = 0
+    compressor = zlib.compressobj(6)
+    pending = None
+
+    tmp_path = delta_path + ".tmp"
+    with open(tmp_path, "wb") as out:
+        out.write(DELTA_MAGIC)
+
+        def emit(data):
+            out.write(compressor.compress(data))
+
+        for _, chunk in iter_chunks(new_path):
+            new_digest.update(chunk)
+            new_size += len(chunk)
+            match = index.get(chunk_key(chunk))
+            if match:
+                copied += len(chunk)
+                if pending and pending[0] + pending[1] == match[0]:
+                    pending = (pending[0], pending[1] + match[1])
+                    continue
+                if pending:
+                    emit(OP_HEADER.pack(COPY_OP, *pending))
+                pending = match
+                continue
+            if pending:
+                emit(OP_HEADER.pack(COPY_OP, *pending))
+                pending = None
+            literal += len(chunk)
+            emit(OP_HEADER.pack(DATA_OP, len(chunk), 0))
+            emit(chunk)
+        if pending:
+            emit(OP_HEADER.pack(COPY_OP, *pending))
+        out.write(compressor.flush())
+    os.replace(tmp_path, delta_path)
+
+    manifest = {
+        "format": DELTA_FORMAT,
+        "old": dict(old_info or {"name": os.path.basename(old_path)}, size=old_size, sha256=old_sha),
+        "new": dict(new_info or {"name": os.path.basename(new_path)}, size=new_size, sha256=new_digest.hexdigest()),
+        "delta": {"file": os.path.basename(delta_path), "size": os.path.getsize(delta_path),
+                  "sha256": file_sha256(delta_path)},
+        "copied_bytes": copied,
+        "literal_bytes": literal,
+        "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+    }
+    with open(delta_path + ".json", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    if log:
+        log(f"增量包: {manifest['delta']['size'] / (1024 * 1024):.2f} MB（完整程序 {new_size / (1024 * 1024):.2f} MB，"
+            f"复用 {copied / max(1, new_size):.1%}），用时 {time.time() - started:.1f}s")
+    return manifest
+
+
+class _OpReader:
+    def __init__(self, f):
+        self.f = f
+        self.decompressor = zlib.decompressobj()
+        self.buffer = b""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self):
+        # Output is capped per call so a highly compressible stretch cannot balloon memory.
+        if self.decompressor.unconsumed_tail:
+            return self.decompressor.decompress(self.decompressor.unconsumed_tail, READ_BLOCK)
+        data = self.f.read(READ_BLOCK)
+        if not data:
+            self.eof = True
+            return self.decompressor.flush()
+        return self.decompressor.decompress(data, READ_BLOCK)
+
+    def read(self, size):
+        while len(self.buffer) - self.pos < size and not self.eof:
+            self.buffer = self.buffer[self.pos:] + self._fill()
+            self.pos = 0
+        result = self.buffer[self.pos:self.pos + size]
+        self.pos += len(result)
+        return result
+
+
+def apply_delta(old_path, manifest_path, new_path, log=None):
+    with open(manifest_path, encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest.get("format") != DELTA_FORMAT:
+        raise ValueError(f"不支持的增量包格式: {manifest.get('format')}")
+    delta_path = os.path.join(os.path.dirname(os.path.abspath(manifest_path)), manifest["delta"]["file"])
+    if file_sha256(delta_path) != manifest["delta"]["sha256"]:
+        raise ValueError("增量包已损坏（校验值不符）")
+    if file_sha256(old_path) != manifest["old"]["sha256"]:
+        raise ValueError("旧版本程序与增量包不匹配")
+
+    digest = hashlib.sha256()
+    tmp_path = new_path + ".tmp"
+    with open(delta_path, "rb") as delta, open(old_path, "rb") as old, open(tmp_path, "wb") as out:
+        if delta.read(len(DELTA_MAGIC)) != DELTA_MAGIC:
+            raise ValueError("不是 Web2EXE 增量包")
+        ops = _OpReader(delta)
+        while True:
+            header = ops.read(OP_HEADER.size)
+            if not header:
+                break
+            op, first, second = OP_HEADER.unpack(header)
+            if op == COPY_OP:
+                old.seek(first)
+                remaining = second
+                while remaining:
+                    data = old.read(min(READ_BLOCK, remaining))
+                    if not data:
+                        raise ValueError("增量包引用了旧版本之外的数据")
+                    digest.update(data)
+                    out.write(data)
+                    remaining -= len(data)
+            elif op == DATA_OP:
+                data = ops.read(first)
+                digest.update(data)
+                out.write(data)
+            else:
+                raise ValueError("增量包内容无效")
+    if digest.hexdigest() != manifest["new"]["sha256"]:
+        os.remove(tmp_path)
+        raise ValueError("生成的新版本校验失败")
+    shutil.copymode(old_path, tmp_path)
+    os.replace(tmp_path, new_path)
+    if log:
+        log(f"已生成新版本: {new_path}")
+    return new_path
+
+
+class ReleaseStore:
+    # Keeps the last shipped artifact of each app so the next build can be diffed against it.
+    def __init__(self, root):
+        self.root = root
+
+    def _dir(self, key):
+        return os.path.join(self.root, key)
+
+    def previous(self, key):
+        try:
+            with open(os.path.join(self._dir(key), "release.json"), encoding="utf-8") as f:
+                info = json.load(f)
+        except (OSError, ValueError):
+            return None
+        path = os.path.join(self._dir(key), info["file"])
+        return (path, info) if os.path.isfile(path) else None
+
+    def store(self, key, artifact, info):
+        directory = self._dir(key)
+        os.makedirs(directory, exist_ok=True)
+        tmp_path = os.path.join(directory, "artifact.tmp")
+        shutil.copyfile(artifact, tmp_path)
+        os.replace(tmp_path, os.path.join(directory, "artifact"))
+        info = dict(info, file="artifact", stored=time.strftime("%Y-%m-%d %H:%M:%S"))
+        with open(os.path.join(directory, "release.json"), "w", encoding="utf-8") as f:
+            json.dump(info, f, ensure_ascii=False, indent=2)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Web2EXE 增量更新包：生成或应用两个版本之间的二进制差异")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    make = sub.add_parser("make", help="根据旧版本和新版本生成增量包（同时生成 .json 清单）")
+    make.add_argument("old")
+    make.add_argument("new")
+    make.add_argument("-o", "--output", help="增量包路径，默认 <新版本>.delta")
+
+    apply = sub.add_parser("apply", help="用旧版本和增量包清单生成新版本")
+    apply.add_argument("old")
+    apply.add_argument("manifest", help="增量包的 .json 清单")
+    apply.add_argument("-o", "--output", help="新版本路径，默认覆盖旧版本")
+
+    args = parser.parse_args(argv)
+    try:
+        if args.command == "make":
+            make_delta(args.old, args.new, args.output or args.new + ".delta", print)
+        else:
+            apply_delta(args.old, args.manifest, args.output or args.old, print)
+    except (OSError, ValueError) as e:
+        print(f"错误：{e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
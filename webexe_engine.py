@@ -0,0 +1,1058 @@
+import os, sys, json, shutil, tempfile, subprocess, threading
+import time
+import argparse
+import shlex
+import hashlib
+import zipfile
+import filecmp
+from concurrent.futures import ThreadPoolExecutor
+
+from webexe_launcher import (build_startup_script_content, build_multisite_script_content, normalize_sites, site_title,
+                             storage_id, WARMUP_MODES, DEFAULT_STORAGE_LIMIT_MB)
+from webexe_cache import BuildCache, DEFAULT_CACHE_SIZE_MB, normalize_command, hash_file
+from webexe_overlay import append_overlay, payload_file_chunks
+from webexe_slim import slim_excludes, run_import_closure, exclude_args, bundle_report, save_report, format_report as format_size_report
+from webexe_metrics import PhaseTimer, MetricsStore, batch_remaining, format_duration
+from webexe_snapshot import (SNAPSHOT_FILENAME, SNAPSHOT_SCOPES, DEFAULT_SNAPSHOT_DEPTH, snapshot_port,
+                             build_snapshot)
+from webexe_splash import bundle_splash
+from webexe_bootsplash import boot_splash_image, boot_splash_supported
+from webexe_pool import WorkerPool, DEFAULT_RECYCLE_JOBS
+from webexe_preflight import IconCache, run_preflight, format_result, DEFAULT_TIMEOUT as DEFAULT_PREFLIGHT_TIMEOUT
+from webexe_compress import COMPRESSION_PROFILES, get_profile, wrap_command
+from webexe_delta import ReleaseStore, make_delta, file_sha256
+from webexe_watch import Watcher, watch, DEFAULT_DEBOUNCE
+from webexe_padding import DEFAULT_PADDING_MB, PADDING_FILLS, padding_writer
+from webexe_template import (PERSISTENT_STUB, template_variant, template_name, template_script, template_key,
+                             can_patch_resources, stamp_launcher, job_payload)
+
+DEFAULT_PYINSTALLER = ["pyinstaller"]
+
+JOB_FIELDS = ("url", "title", "version", "company", "desc", "icon", "winicon",
+              "splash_html", "use_webview", "use_splash", "increase_volume", "padding_mb", "package_mode",
+              "output_dir", "snapshot", "snapshot_depth", "snapshot_scope", "snapshot_fallthrough",
+              "compression", "sites", "idle_unload", "storage", "storage_limit_mb", "warmup",
+              "boot_splash", "splash_image")
+PACKAGE_MODES = ("onefile", "onedir", "persistent")
+
+
+class BuildCancelled(Exception):
+    pass
+
+
+def default_max_workers():
+    return max(1, (os.cpu_count() or 2) // 2)
+
+
+_print_lock = threading.Lock()
+
+
+def default_data_dir():
+    if os.environ.get("WEB2EXE_HOME"):
+        return os.environ["WEB2EXE_HOME"]
+    if sys.platform == "win32":
+        return os.path.join(os.environ.get("LOCALAPPDATA") or os.path.expanduser("~"), "Web2EXE")
+    return os.path.join(os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"), "web2exe")
+
+
+def _probe_output(cmd):
+    try:
+        output = subprocess.run(cmd, capture_output=True, text=True, encoding='utf-8', errors='replace', timeout=120)
+        return output.stdout.strip() or output.stderr.strip()
+    except (OSError, subprocess.SubprocessError) as e:
+        return f"unknown ({e})"
+
+
+def _print_log(message):
+    with _print_lock:
+        sys.stdout.write(message + "\n")
+        sys.stdout.flush()
+
+
+def _kill_process(process):
+    if process.poll() is not None:
+        return
+    if sys.platform == "win32":
+        # pyinstaller.exe is a launcher that runs Python as a child process, so the whole tree has to go.
+        subprocess.run(["taskkill", "/F", "/T", "/PID", str(process.pid)], capture_output=True)
+    else:
+        process.kill()
+
+
+def _write_text(path, text):
+    # An unchanged script keeps its mtime, so PyInstaller can reuse the analysis in a persistent work directory.
+    try:
+        with open(path, encoding="utf-8") as f:
+            if f.read() == text:
+                return
+    except OSError:
+        pass
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+
+
+def _exe_suffix():
+    return ".exe" if sys.platform == "win32" else ""
+
+
+def _safe_filename(name):
+    return "".join("_" if ch in '\\/:*?"<>|' or ord(ch) < 32 else ch for ch in name).strip() or "job"
+
+
+class JobLog:
+    def __init__(self, path, prefix, forward):
+        self.path = path
+        self.prefix = prefix
+        self.forward = forward
+        self._lock = threading.Lock()
+        self._file = open(path, "a", encoding="utf-8", buffering=1)
+
+    def __call__(self, message):
+        with self._lock:
+            if self._file:
+                self._file.write(message + "\n")
+        self.forward(self.prefix + message)
+
+    def close(self):
+        with self._lock:
+            if self._file:
+                self._file.close()
+                self._file = None
+
+
+class BuildJob:
+    def __init__(self, url, title="", version="", company="", desc="", icon="", winicon="",
+                 splash_html="", use_webview=True, use_splash=False, increase_volume=False,
+                 padding_mb=DEFAULT_PADDING_MB, package_mode="onefile", output_dir="", index=0,
+                 snapshot=False, snapshot_depth=DEFAULT_SNAPSHOT_DEPTH, snapshot_scope="host",
+                 snapshot_fallthrough=True, compression="default", sites=None, idle_unload=0,
+                 storage=False, storage_limit_mb=DEFAULT_STORAGE_LIMIT_MB, warmup="off", boot_splash=False,
+                 splash_image=""):
+        if package_mode not in PACKAGE_MODES:
+            raise ValueError(f"未知的输出方式: {package_mode}")
+        if snapshot_scope not in SNAPSHOT_SCOPES:
+            raise ValueError(f"未知的快照范围: {snapshot_scope}")
+        if warmup not in WARMUP_MODES:
+            raise ValueError(f"未知的预热方式: {warmup}")
+        get_profile(compression)
+        self.url = url.strip()
+        self.index = index
+        self.title = title or f"App{index+1}"
+        self.version = version
+        self.company = company
+        self.desc = desc
+        self.icon = icon
+        self.winicon = winicon
+        self.splash_html = splash_html
+        self.use_webview = use_webview
+        self.use_splash = use_splash
+        self.increase_volume = increase_volume
+        self.padding_mb = padding_mb
+        self.package_mode = package_mode
+        self.output_dir = output_dir
+        self.snapshot = snapshot
+        self.snapshot_depth = snapshot_depth
+        self.snapshot_scope = snapshot_scope
+        self.snapshot_fallthrough = snapshot_fallthrough
+        self.compression = compression
+        self.sites = normalize_sites(sites) if sites else None
+        self.idle_unload = idle_unload
+        self.storage = storage
+        self.storage_limit_mb = storage_limit_mb
+        self.warmup = warmup
+        self.boot_splash = boot_splash
+        self.splash_image = splash_image
+        self.name = self.title
+
+    @classmethod
+    def from_dict(cls, data, defaults=None, index=0):
+        if isinstance(data, str):
+            data = {"url": data}
+        merged = dict(defaults or {})
+        merged.update({k: v for k, v in data.items() if v is not None})
+        unknown = set(merged) - set(JOB_FIELDS)
+        if unknown:
+            raise ValueError(f"未知的清单字段: {', '.join(sorted(unknown))}")
+        if not merged.get("url") and merged.get("sites"):
+            merged["url"] = normalize_sites(merged["sites"])[0]["url"]
+        if not merged.get("url"):
+            raise ValueError(f"第 {index+1} 项缺少 url")
+        return cls(index=index, **merged)
+
+    def to_dict(self):
+        data = {key: getattr(self, key) for key in JOB_FIELDS}
+        data["name"] = self.name
+        return data
+
+    @property
+    def has_splash(self):
+        return bool(self.use_splash and self.splash_html and os.path.exists(self.splash_html) and not self.sites
+                    and not self.boot_splash)
+
+    @property
+    def has_boot_splash(self):
+        source = self.splash_image or (self.use_splash and self.splash_html)
+        return bool(self.boot_splash and source and os.path.exists(source) and not self.sites)
+
+    @property
+    def winicon_clean(self):
+        return self.winicon.replace('\\', '/') if self.winicon else ""
+
+    @property
+    def urls(self):
+        return [site["url"] for site in self.sites] if self.sites else [self.url]
+
+    def storage_options(self):
+        if not self.storage:
+            return None
+        return {"id": storage_id(self.title, self.url), "limit_mb": self.storage_limit_mb}
+
+    def startup_script(self):
+        if self.sites:
+            if not self.use_webview:
+                raise ValueError("多站点启动器需要使用内置浏览器 (pywebview)")
+            if self.snapshot:
+                raise ValueError("多站点启动器不支持离线快照")
+            return build_multisite_script_content(self.sites, self.title, self.winicon_clean, self.idle_unload,
+                                                  self.storage_options())
+        return build_startup_script_content(
+            self.url, self.title, self.company, self.winicon_clean,
+            self.use_webview, self.has_splash, self.splash_html,
+            {"fallthrough": self.snapshot_fallthrough, "port": snapshot_port(self.url)} if self.snapshot else None,
+            self.storage_options(), self.warmup, self.has_boot_splash
+        )
+
+
+class BuildResult:
+    def __init__(self, job, success=False, returncode=None, artifact="", error="", elapsed=0.0, log_path="", phases=None):
+        self.job = job
+        self.delta = ""
+        self.cancelled = False
+        self.log_path = log_path
+        self.success = success
+        self.returncode = returncode
+        self.artifact = artifact
+        self.error = error
+        self.elapsed = elapsed
+        self.phases = phases or {}
+
+    def to_dict(self):
+        return {
+            "name": self.job.name,
+            "url": self.job.url,
+            "success": self.success,
+            "returncode": self.returncode,
+            "artifact": self.artifact,
+            "error": self.error,
+            "elapsed": round(self.elapsed, 3),
+            "log": self.log_path,
+            "phases": self.phases,
+            "delta": self.delta,
+        }
+
+
+def multisite_job(jobs, title="", idle_unload=0):
+    # Jobs without their own title show their address in the site table.
+    sites = [{"title": job.title if job.title != f"App{job.index+1}" else site_title(job.url), "url": job.url}
+             for job in jobs]
+    data = jobs[0].to_dict()
+    data.pop("url")
+    data.pop("name")
+    data.update(title=title or jobs[0].title, sites=sites, idle_unload=idle_unload)
+    return BuildJob(sites[0]["url"], **data)
+
+
+def load_manifest(path):
+    with open(path, encoding="utf-8") as f:
+        text = f.read()
+
+    if os.path.splitext(path)[1].lower() != ".json":
+        urls = [line.strip() for line in text.splitlines()]
+        return [BuildJob(url, index=idx) for idx, url in enumerate(u for u in urls if u and not u.startswith("#"))]
+
+    data = json.loads(text)
+    defaults = {}
+    entries = data
+    if isinstance(data, dict):
+        defaults = data.get("defaults", {})
+        entries = data.get("jobs", [])
+    if not isinstance(entries, list):
+        raise ValueError("清单中的 jobs 必须是列表")
+    return [BuildJob.from_dict(entry, defaults, idx) for idx, entry in enumerate(entries)]
+
+
+class BuildEngine:
+    def __init__(self, max_workers=None, pyinstaller=None, log=None,
+                 on_job_start=None, on_job_done=None, keep_temp=False,
+                 template_mode=False, data_dir=None, use_cache=True, cache_size_mb=DEFAULT_CACHE_SIZE_MB,
+                 padding_fill="random", log_dir=None, slim=False, splash_inline=False, pool=None,
+                 preflight=False, preflight_timeout=DEFAULT_PREFLIGHT_TIMEOUT, delta=False, work_dir=None):
+        self.max_workers = max(1, max_workers or default_max_workers())
+        self.pyinstaller = list(pyinstaller or DEFAULT_PYINSTALLER)
+        self.log = log or _print_log
+        self.on_job_start = on_job_start
+        self.on_job_done = on_job_done
+        self.keep_temp = keep_temp
+        self.template_mode = template_mode
+        self.padding_fill = padding_fill
+        self.slim = slim
+        self.splash_inline = splash_inline
+        self.pool = pool
+        self.preflight = preflight
+        self.preflight_timeout = preflight_timeout
+        self.delta = delta
+        self.work_dir = work_dir
+        self.data_dir = data_dir or default_data_dir()
+        self.log_root = log_dir
+        self.log_dir = log_dir or os.path.join(self.data_dir, "logs")
+        self._lock = threading.Lock()
+        self._tool_version = None
+        self._template_locks = {}
+        self._closures = {}
+        self.metrics = MetricsStore(os.path.join(self.data_dir, "metrics"))
+        self._running = {}
+        self._queued = {}
+        self._batch_started = None
+        self._cancel = threading.Event()
+        self._processes = set()
+        self.cache = None
+        if use_cache:
+            self.cache = BuildCache(os.path.join(self.data_dir, "cache"), cache_size_mb, log=self.log)
+
+    def run(self, jobs, plan=None):
+        # plan maps job.index to "build" or "bundle"; jobs left out are only used to keep output names stable.
+        jobs = list(jobs)
+        self._cancel.clear()
+        self.log_dir = self.log_root or os.path.join(
+            self.data_dir, "logs", time.strftime("%Y%m%d-%H%M%S") + f"-{os.getpid()}")
+        self.log(f"每个任务的完整日志保存在: {self.log_dir}")
+        self._assign_unique_names(jobs)
+        if plan is not None:
+            jobs = [job for job in jobs if job.index in plan]
+        with self._lock:
+            self._batch_started = time.time()
+        rejected = self.preflight_jobs(jobs) if self.preflight else {}
+        buildable = [job for job in jobs if job.index not in rejected]
+        with self._lock:
+            self._queued = {job.index: job for job in buildable}
+        self.log(f"--- 共 {len(buildable)} 个任务，并行数 {self.max_workers} ---")
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="web2exe") as pool:
+            templates = self._prepare_templates(pool, [job for job in buildable if not plan or plan[job.index] != "bundle"])
+            futures = {job.index: pool.submit(self.build_job, job,
+                                              templates.get(template_variant(job)) if self.template_eligible(job) else None,
+                                              bool(plan) and plan[job.index] == "bundle")
+                       for job in buildable}
+            results = [rejected[job.index] if job.index in rejected else futures[job.index].result() for job in jobs]
+
+        if self.cache:
+            self.log(self.cache.report())
+        succeeded = sum(1 for r in results if r.success)
+        cancelled = sum(1 for r in results if r.cancelled)
+        self.log(f"--- 所有打包任务已结束：成功 {succeeded}，失败 {len(results) - succeeded - cancelled}，"
+                 + (f"取消 {cancelled}，" if cancelled else "")
+                 + f"用时 {format_duration(time.time() - self._batch_started)} ---")
+        return results
+
+    def cancel(self):
+        # Stops the running batch: queued jobs end as cancelled and running PyInstaller processes are killed.
+        self._cancel.set()
+        with self._lock:
+            processes = list(self._processes)
+        for process in processes:
+            _kill_process(process)
+        if self.pool is not None:
+            self.pool.cancel()
+
+    def progress(self):
+        with self._lock:
+            running = list(self._running.values())
+            queued = list(self._queued.values())
+            started = self._batch_started
+        jobs = []
+        for job, timer in running:
+            remaining = self.metrics.remaining(timer, job.increase_volume)
+            jobs.append((job.name, timer.current, remaining))
+        batch = batch_remaining([remaining for _, _, remaining in jobs],
+                                [self.metrics.estimate(self._job_profile(job, self.template_eligible(job)), job.increase_volume) for job in queued],
+                                self.max_workers)
+        return {
+            "elapsed": time.time() - started if started else 0.0,
+            "jobs": jobs,
+            "queued": len(queued),
+            "remaining": batch,
+        }
+
+    def preflight_jobs(self, jobs):
+        started = time.time()
+        urls = [url for job in jobs for url in job.urls]
+        icon_urls = [job.urls[0] for job in jobs if not job.icon]
+        self.log(f"正在检查 {len(set(urls))} 个网址" + ("并获取网站图标" if icon_urls else ""))
+        checks = run_preflight(urls, self.preflight_timeout, icon_urls, IconCache(os.path.join(self.data_dir, "icons")))
+        for check in checks.values():
+            self.log(f"[预检] {format_result(check)}")
+
+        rejected = {}
+        for job in jobs:
+            errors = [f"{url}：{checks[url].error}" for url in job.urls if checks[url].fatal]
+            warnings = [f"{url}：{checks[url].error}" for url in job.urls if not checks[url].ok and not checks[url].fatal]
+            if errors:
+                rejected[job.index] = self._reject_job(job, "网址不可用: " + "；".join(errors))
+                continue
+            if warnings:
+                self.log(f"警告：{job.name} 的网址暂时无法连接，仍然打包（" + "；".join(warnings) + "）")
+            if not job.icon and checks[job.urls[0]].icon:
+                job.icon = checks[job.urls[0]].icon
+        self.log(f"预检完成：{len(set(urls))} 个网址，{len(rejected)} 个任务未通过，用时 {time.time() - started:.1f}s")
+        return rejected
+
+    def _reject_job(self, job, error):
+        log = self._job_logger(job.name)
+        log(f"预检失败，跳过打包。{error}")
+        log.close()
+        result = BuildResult(job, error=error, log_path=log.path)
+        if self.on_job_done:
+            self.on_job_done(result)
+        return result
+
+    def _job_profile(self, job, from_template):
+        if from_template:
+            return "template"
+        variant = "webview" if job.use_webview else "browser"
+        return (f"{job.package_mode}-{variant}" + ("-slim" if self.slim else "") + ("-snapshot" if job.snapshot else "")
+                + ("-pool" if self.pool else "") + ("-multisite" if job.sites else "") + ("" if job.compression == "default" else f"-{job.compression}"))
+
+    def _prepare_templates(self, pool, jobs):
+        variants = sorted({template_variant(job) for job in jobs if self.template_eligible(job)})
+        futures = {variant: pool.submit(self.ensure_template, variant) for variant in variants}
+        templates = {}
+        for variant, future in futures.items():
+            try:
+                templates[variant] = future.result()
+            except BuildCancelled:
+                pass
+            except Exception as e:
+                self.log(f"警告：无法生成模板 {template_name(variant)}: {e}。相关任务将完整打包。")
+        return templates
+
+    def _assign_unique_names(self, jobs):
+        seen = {}
+        for job in jobs:
+            key = (os.path.normcase(os.path.abspath(job.output_dir or ".")), job.title.lower())
+            if key in seen:
+                job.name = f"{job.title}-{job.index+1}"
+                self.log(f"警告：输出名称 {job.title} 重复，任务 {job.index+1} 改名为 {job.name}")
+            else:
+                job.name = job.title
+            seen[key] = job
+
+    def build_command(self, job, job_dir, script_path, dist_dir, splash_dir=None, boot_image=None):
+        mode_flag = "--onefile" if job.package_mode == "onefile" else "--onedir"
+        cmd = self.pyinstaller + ["--noconfirm", mode_flag, "--noconsole", script_path, "--name", job.name]
+
+        if job.icon:
+            cmd += ["--icon", os.path.abspath(job.icon)]
+
+        cmd += ["--distpath", dist_dir]
+        cmd += ["--workpath", os.path.join(job_dir, "build")]
+        cmd += ["--specpath", job_dir]
+
+        if job.has_splash:
+            splash_dir = splash_dir or self._splash_bundle(job)
+            cmd += ["--add-data", f"{splash_dir}{os.pathsep}."]
+
+        if job.snapshot:
+            cmd += ["--add-data", f"{os.path.join(job_dir, SNAPSHOT_FILENAME)}{os.pathsep}."]
+
+        if boot_image:
+            cmd += ["--splash", boot_image]
+
+        cmd += self._slim_args(job.startup_script())
+        cmd += get_profile(job.compression).pyinstaller_args()
+        return cmd
+
+    def _slim_args(self, script):
+        if not self.slim:
+            return []
+        return exclude_args(slim_excludes(script, closure=self._import_closure(script)))
+
+    def _import_closure(self, script):
+        key = hashlib.sha256(script.encode("utf-8")).hexdigest()
+        with self._lock:
+            if key in self._closures:
+                return self._closures[key]
+        closure = run_import_closure(script, self._tool_python())
+        if closure is None:
+            self.log("警告：无法分析启动脚本的导入，精简模式只保留脚本直接导入的模块")
+        with self._lock:
+            self._closures[key] = closure
+        return closure
+
+    def build_job(self, job, template_path=None, refresh_bundle=False):
+        log = self._job_logger(job.name)
+        result = BuildResult(job)
+        result.log_path = log.path
+        timer = PhaseTimer(job.name, "bundle" if refresh_bundle else self._job_profile(job, bool(template_path)))
+        timer.phase("prepare")
+        with self._lock:
+            self._queued.pop(job.index, None)
+            self._running[job.index] = (job, timer)
+        job_dir = self._job_dir(job)
+
+        if self.on_job_start:
+            self.on_job_start(job)
+        try:
+            if self._cancel.is_set():
+                raise BuildCancelled()
+            log(f"正在处理网址: {job.url}")
+            if job.sites:
+                log(f"多站点启动器：{len(job.sites)} 个网址，按需打开窗口")
+            os.makedirs(job.output_dir, exist_ok=True)
+
+            if refresh_bundle:
+                timer.phase("bundle")
+                result.artifact = self._refresh_bundle(job, log)
+                result.returncode = 0
+                result.success = True
+            elif template_path:
+                timer.phase("stamp")
+                overlay = [self._padding_writer(job, log)] if job.increase_volume else []
+                payload = [job_payload(job, self._splash_bundle(job, log) if job.has_splash else None)]
+                result.artifact = stamp_launcher(template_path, self._artifact_path(job), job, log, overlay, payload)
+                result.returncode = 0
+                result.success = True
+                log(f"已从模板生成: {result.artifact}")
+            else:
+                script_path = os.path.join(job_dir, "web2exe_startup.py")
+                _write_text(script_path, job.startup_script())
+                log(f"临时启动脚本已生成: {script_path}")
+
+                if job.snapshot:
+                    timer.phase("snapshot")
+                    log(f"正在抓取离线快照（深度 {job.snapshot_depth}，范围 {job.snapshot_scope}）")
+                    build_snapshot(job.url, os.path.join(job_dir, SNAPSHOT_FILENAME),
+                                   job.snapshot_depth, job.snapshot_scope, log)
+
+                if job.package_mode == "persistent":
+                    dist_dir = os.path.join(job_dir, "dist")
+                else:
+                    dist_dir = os.path.abspath(job.output_dir)
+                built = self._pyinstaller_output(job, dist_dir)
+                splash_dir = self._splash_bundle(job, log) if job.has_splash else None
+                boot_image = self._boot_splash_image(job, log) if job.has_boot_splash else None
+                cmd = self.build_command(job, job_dir, script_path, dist_dir, splash_dir, boot_image)
+                log(f"PyInstaller 命令: {' '.join(cmd)}")
+
+                cache_key = self._cache_key(job, cmd, job_dir, dist_dir, splash_dir, boot_image) if self.cache else None
+                timer.phase("cache")
+                if cache_key and self.cache.fetch(cache_key, built):
+                    timer.cached = True
+                    result.returncode = 0
+                    result.success = True
+                    log(f"构建缓存命中 ({cache_key[:12]})，已复制: {built}")
+                else:
+                    if cache_key:
+                        log(f"构建缓存未命中 ({cache_key[:12]})")
+                    timer.phase("analysis")
+                    result.returncode = self._run_process(cmd, log, timer.feed, get_profile(job.compression))
+                    if result.returncode == 0:
+                        timer.phase("post")
+                        result.success = True
+                        log(f"打包成功: {built}")
+                        self._size_report(job, os.path.join(job_dir, "build", job.name), built, log)
+                        if cache_key:
+                            self.cache.store(cache_key, built, {"name": job.name, "url": job.url})
+                    else:
+                        result.error = f"PyInstaller 退出码 {result.returncode}"
+                        log(f"打包失败。错误码: {result.returncode}")
+
+                if result.success and job.package_mode == "persistent":
+                    timer.phase("post")
+                    result.artifact = self._wrap_persistent(job, built, job_dir, log)
+                elif result.success:
+                    result.artifact = built
+                    if job.increase_volume:
+                        timer.phase("padding")
+                        append_overlay(self.main_executable(job, built), [self._padding_writer(job, log)])
+
+            if result.success and self.delta:
+                timer.phase("delta")
+                result.delta = self._make_delta(job, result.artifact, log)
+        except BuildCancelled:
+            result.success = False
+            result.cancelled = True
+            result.error = "已取消"
+            log("任务已取消")
+        except FileNotFoundError:
+            result.error = "未找到 PyInstaller 命令。请确保它已安装并添加到系统 PATH 中。"
+            log(f"错误：{result.error}")
+        except Exception as e:
+            result.error = str(e)
+            log(f"未知错误：{e}")
+        return self._finish_job(result, job_dir, log, timer)
+
+    def _finish_job(self, result, job_dir, log, timer):
+        timer.phase("finish")
+        if self.keep_temp or not (result.success or result.cancelled):
+            log(f"保留任务临时目录: {job_dir}")
+        elif not self.work_dir:
+            shutil.rmtree(job_dir, ignore_errors=True)
+        result.elapsed = timer.stop()
+        self._record_metrics(result, timer, log)
+        with self._lock:
+            self._running.pop(result.job.index, None)
+
+        log("--- 单个打包任务结束 ---")
+        log.close()
+        if self.on_job_done:
+            self.on_job_done(result)
+        return result
+
+    def _job_dir(self, job):
+        if not self.work_dir:
+            return tempfile.mkdtemp(prefix="web2exe_job_")
+        # A fixed work directory per app lets PyInstaller reuse its analysis from the previous build.
+        job_dir = os.path.join(self.work_dir, f"{_safe_filename(job.name)}-{job.package_mode}")
+        os.makedirs(job_dir, exist_ok=True)
+        return job_dir
+
+    def _refresh_bundle(self, job, log):
+        # Copies the rebuilt splash bundle over the data files of an existing onedir output.
+        artifact = self._artifact_path(job)
+        if job.package_mode != "onedir" or not os.path.isfile(self.main_executable(job, artifact)):
+            raise RuntimeError(f"没有可以直接更新的输出目录: {artifact}")
+        contents_dir = os.path.join(artifact, "_internal")
+        if not os.path.isdir(contents_dir):
+            contents_dir = artifact
+        splash_dir = self._splash_bundle(job, log)
+        updated = 0
+        for dirpath, dirnames, filenames in os.walk(splash_dir):
+            for filename in filenames:
+                source = os.path.join(dirpath, filename)
+                target = os.path.join(contents_dir, os.path.relpath(source, splash_dir))
+                if os.path.isfile(target) and filecmp.cmp(source, target, shallow=False):
+                    continue
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                shutil.copyfile(source, target)
+                updated += 1
+        log(f"已更新启动页资源 {updated} 个文件，无需重新打包: {artifact}")
+        return artifact
+
+    def _record_metrics(self, result, timer, log):
+        record = timer.to_dict(result.success)
+        result.phases = record["phases"]
+        log("[阶段] " + ", ".join(f"{name} {seconds:.1f}s" for name, seconds in record["phases"].items())
+            + f"，共 {record['total']:.1f}s")
+        try:
+            self.metrics.record(record, os.path.join(self.log_dir, _safe_filename(result.job.name) + ".metrics.json"))
+        except OSError as e:
+            log(f"警告：无法写入阶段耗时记录: {e}")
+
+    def _size_report(self, job, workpath, artifact, log):
+        try:
+            report = bundle_report(workpath, artifact)
+            name = _safe_filename(job.name)
+            previous = save_report(report, os.path.join(self.log_dir, name + ".size.json"),
+                                   os.path.join(self.data_dir, "size", f"{name}-{job.package_mode}.json"))
+            for line in format_size_report(report, previous):
+                log(f"[体积] {line}")
+        except Exception as e:
+            log(f"警告：无法生成体积报告: {e}")
+
+    def _splash_bundle(self, job, log=None):
+        return bundle_splash(job.splash_html, os.path.join(self.data_dir, "splash"), self.splash_inline, log)
+
+    def _boot_splash_image(self, job, log):
+        if not boot_splash_supported():
+            log("警告：当前平台的 PyInstaller 不支持启动画面，已忽略")
+            return None
+        splash_dir = None if job.splash_image else self._splash_bundle(job, log)
+        return boot_splash_image(job.splash_image, splash_dir, job.splash_html,
+                                 os.path.join(self.data_dir, "bootsplash"), log)
+
+    def _padding_writer(self, job, log):
+        size_bytes = int(job.padding_mb * 1024 * 1024)
+        fill = get_profile(job.compression).padding_fill or self.padding_fill
+        log(f"追加 {job.padding_mb}MB 填充数据（{fill}）")
+        return padding_writer(size_bytes, fill, os.path.join(self.data_dir, "padding"))
+
+    def _make_delta(self, job, artifact, log):
+        if os.path.isdir(artifact):
+            log("目录输出不生成增量包")
+            return ""
+        try:
+            store = ReleaseStore(os.path.join(self.data_dir, "releases"))
+            key = f"{_safe_filename(job.name)}-{job.package_mode}"
+            previous = store.previous(key)
+            info = {"name": os.path.basename(artifact), "version": job.version, "url": job.url,
+                    "sha256": file_sha256(artifact)}
+            delta_path = ""
+            if previous is None:
+                log("没有上一版本，本次结果作为下次增量包的基准")
+            elif previous[1]["sha256"] == info["sha256"]:
+                log("与上一版本完全相同，不生成增量包")
+                return ""
+            else:
+                old_path, old_info = previous
+                delta_path = os.path.join(os.path.dirname(artifact),
+                                          f"{job.name}.{old_info['sha256'][:8]}-{info['sha256'][:8]}.delta")
+                make_delta(old_path, artifact, delta_path, log,
+                           {k: old_info.get(k) for k in ("name", "version", "url")},
+                           {k: info[k] for k in ("name", "version", "url")})
+            store.store(key, artifact, info)
+            return delta_path
+        except Exception as e:
+            log(f"警告：无法生成增量包: {e}")
+            return ""
+
+    def _wrap_persistent(self, job, onedir_path, job_dir, log):
+        archive_path = os.path.join(job_dir, "onedir.zip")
+        digest = hashlib.sha256()
+        with zipfile.ZipFile(archive_path, "w", zipfile.ZIP_DEFLATED) as archive:
+            for dirpath, dirnames, filenames in os.walk(onedir_path):
+                dirnames.sort()
+                for filename in sorted(filenames):
+                    full_path = os.path.join(dirpath, filename)
+                    arcname = os.path.relpath(full_path, onedir_path).replace(os.sep, "/")
+                    digest.update(arcname.encode("utf-8") + b"\0")
+                    hash_file(digest, full_path)
+                    archive.write(full_path, arcname)
+
+        app_id = f"{_safe_filename(job.name)}-{digest.hexdigest()[:16]}"
+        config = {
+            "id": app_id,
+            "name": _safe_filename(job.name),
+            "exe": os.path.basename(self.main_executable(job, onedir_path)),
+        }
+        log(f"持久解压模式：首次启动解压到本机缓存目录 {app_id}，之后直接启动")
+
+        stub = self.ensure_template(PERSISTENT_STUB)
+        overlay = [self._padding_writer(job, log)] if job.increase_volume else []
+        payload = payload_file_chunks(json.dumps(config, ensure_ascii=False).encode("utf-8"), archive_path)
+        return stamp_launcher(stub, self._artifact_path(job), job, log, overlay, payload)
+
+    def _cache_key(self, job, cmd, job_dir, dist_dir, splash_dir=None, boot_image=None):
+        replacements = [(job_dir, "<job>"), (dist_dir, "<dist>")]
+        if splash_dir:
+            replacements.append((splash_dir, "<splash>"))
+        if boot_image:
+            replacements.append((boot_image, "<boot-splash>"))
+        if job.icon:
+            replacements.append((os.path.abspath(job.icon), "<icon>"))
+        return self.cache.make_key(
+            job.startup_script(),
+            normalize_command(cmd + get_profile(job.compression).key_args(), replacements),
+            self.tool_version(),
+            files=[job.icon, os.path.join(job_dir, SNAPSHOT_FILENAME) if job.snapshot else "", boot_image or ""],
+            trees=[splash_dir or ""],
+        )
+
+    def _job_logger(self, name):
+        os.makedirs(self.log_dir, exist_ok=True)
+        return JobLog(os.path.join(self.log_dir, _safe_filename(name) + ".log"), f"[{name}] ", self.log)
+
+    def tool_version(self):
+        with self._lock:
+            if self._tool_version is None:
+                self._tool_version = {
+                    "pyinstaller": _probe_output(self.pyinstaller + ["--version"]),
+                    "python": _probe_output([self._tool_python(), "-c", "import sys; print(sys.version)"]),
+                }
+            return self._tool_version
+
+    def _tool_python(self):
+        executable = shutil.which(self.pyinstaller[0]) or self.pyinstaller[0]
+        if os.path.basename(executable).lower().startswith("python"):
+            return executable
+        scripts_dir = os.path.dirname(os.path.realpath(executable))
+        names = ["python.exe"] if sys.platform == "win32" else ["python3", "python"]
+        for directory in (scripts_dir, os.path.dirname(scripts_dir)):
+            for name in names:
+                candidate = os.path.join(directory, name)
+                if os.path.isfile(candidate):
+                    return candidate
+        return sys.executable
+
+    def template_eligible(self, job):
+        if not self.template_mode or job.package_mode != "onefile" or job.snapshot or job.compression != "default" or job.sites or job.boot_splash:
+            return False
+        if job.icon and sys.platform == "win32" and not can_patch_resources():
+            return False
+        return True
+
+    def ensure_template(self, variant):
+        key = template_key(variant, self.pyinstaller + self._slim_args(template_script(variant)), self.tool_version())
+        with self._lock:
+            key_lock = self._template_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            return self._ensure_template(variant, key)
+
+    def _ensure_template(self, variant, key):
+        template_dir = os.path.join(self.data_dir, "templates", key)
+        suffix = _exe_suffix()
+        template_path = os.path.join(template_dir, template_name(variant) + suffix)
+        if os.path.exists(template_path):
+            self.log(f"使用已有模板: {template_path}")
+            return template_path
+
+        log = self._job_logger(template_name(variant))
+        job_dir = tempfile.mkdtemp(prefix="web2exe_template_")
+        try:
+            script_path = os.path.join(job_dir, "web2exe_template.py")
+            with open(script_path, "w", encoding="utf-8") as f:
+                f.write(template_script(variant))
+            dist_dir = os.path.join(job_dir, "dist")
+            cmd = self.pyinstaller + ["--noconfirm", "--onefile", "--noconsole", script_path,
+                                      "--name", template_name(variant),
+                                      "--distpath", dist_dir,
+                                      "--workpath", os.path.join(job_dir, "build"),
+                                      "--specpath", job_dir]
+            cmd += self._slim_args(template_script(variant))
+            log(f"正在生成通用启动器模板: {' '.join(cmd)}")
+            returncode = self._run_process(cmd, log)
+            if returncode != 0:
+                raise RuntimeError(f"模板打包失败，错误码: {returncode}")
+            os.makedirs(template_dir, exist_ok=True)
+            os.replace(os.path.join(dist_dir, template_name(variant) + suffix), template_path)
+            log(f"模板已生成: {template_path}")
+            return template_path
+        finally:
+            log.close()
+            shutil.rmtree(job_dir, ignore_errors=True)
+
+    def make_pool(self, recycle_jobs=DEFAULT_RECYCLE_JOBS):
+        python = self._pool_python()
+        if python is None:
+            self.log(f"警告：常驻打包进程只支持 pyinstaller 或 python -m PyInstaller，将逐个启动: {' '.join(self.pyinstaller)}")
+            return None
+        return WorkerPool(python, self.max_workers, recycle_jobs, log=self.log)
+
+    def _pool_python(self):
+        first = os.path.basename(self.pyinstaller[0]).lower()
+        if len(self.pyinstaller) == 1 and first.startswith("pyinstaller"):
+            return self._tool_python()
+        if first.startswith("python") and self.pyinstaller[1:] == ["-m", "PyInstaller"]:
+            return self.pyinstaller[0]
+        return None
+
+    def _run_process(self, cmd, log, on_line=None, compression=None):
+        if self._cancel.is_set():
+            raise BuildCancelled()
+        returncode = self._start_process(cmd, log, on_line, compression)
+        if self._cancel.is_set():
+            raise BuildCancelled()
+        return returncode
+
+    def _start_process(self, cmd, log, on_line=None, compression=None):
+        env = compression.env() if compression else {}
+        levels = compression.levels if compression else None
+        is_pyinstaller = cmd[:len(self.pyinstaller)] == self.pyinstaller
+        if self.pool is not None and is_pyinstaller:
+            def pool_line(line):
+                if on_line:
+                    on_line(line)
+                log(f"[PyInstaller ERROR] {line.rstrip()}")
+            return self.pool.run(cmd[len(self.pyinstaller):], pool_line, env, levels)
+
+        if levels and is_pyinstaller:
+            python = self._pool_python()
+            if python:
+                cmd = wrap_command(python, cmd[len(self.pyinstaller):], levels)
+            else:
+                log("警告：当前 PyInstaller 命令无法设置 PYZ/PKG 压缩级别，将使用默认级别")
+        process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                   text=True, encoding='utf-8', errors='replace',
+                                   env=dict(os.environ, **env) if env else None)
+        with self._lock:
+            self._processes.add(process)
+        if self._cancel.is_set():
+            _kill_process(process)
+
+        def read_stream(stream, prefix):
+            for line in iter(stream.readline, ''):
+                if on_line:
+                    on_line(line)
+                log(f"[{prefix}] {line.rstrip()}")
+            stream.close()
+
+        stderr_thread = threading.Thread(target=read_stream, args=(process.stderr, "PyInstaller ERROR"), daemon=True)
+        stderr_thread.start()
+        read_stream(process.stdout, "PyInstaller")
+        stderr_thread.join()
+        returncode = process.wait()
+        with self._lock:
+            self._processes.discard(process)
+        return returncode
+
+    def _artifact_path(self, job):
+        if job.package_mode == "onedir":
+            return os.path.join(os.path.abspath(job.output_dir), job.name)
+        return os.path.join(os.path.abspath(job.output_dir), job.name + _exe_suffix())
+
+    def _pyinstaller_output(self, job, dist_dir):
+        if job.package_mode == "onefile":
+            return os.path.join(dist_dir, job.name + _exe_suffix())
+        return os.path.join(dist_dir, job.name)
+
+    def main_executable(self, job, artifact):
+        if os.path.isdir(artifact):
+            return os.path.join(artifact, job.name + _exe_suffix())
+        return artifact
+
+
+def build_arg_parser():
+    parser = argparse.ArgumentParser(description="Web2EXE 无界面批量打包")
+    parser.add_argument("manifest", help="任务清单：.json（defaults + jobs）或每行一个网址的文本文件")
+    parser.add_argument("-o", "--output", help="默认输出目录（清单中未指定 output_dir 时使用）")
+    parser.add_argument("-j", "--jobs", type=int, default=default_max_workers(), help="并行打包数量")
+    parser.add_argument("--pyinstaller", default=None, help="PyInstaller 命令，默认 pyinstaller")
+    parser.add_argument("--browser", action="store_true", help="使用系统默认浏览器而不是内置浏览器")
+    parser.add_argument("--icon", help="默认程序图标 (.ico)")
+    parser.add_argument("--winicon", help="默认窗口图标 (.ico)")
+    parser.add_argument("--splash", help="默认启动页 HTML")
+    parser.add_argument("--boot-splash", action="store_true",
+                        help="由 PyInstaller 引导程序在解压前立即显示启动画面（启动页 HTML 会先渲染为图片），主窗口加载后关闭")
+    parser.add_argument("--splash-image", help="启动画面图片 (.png)，与 --boot-splash 一起使用，代替渲染启动页")
+    parser.add_argument("--splash-inline", action="store_true",
+                        help="把启动页中较小的 CSS/JS/图片内联到 HTML 中并压缩，只打包一个文件")
+    parser.add_argument("--increase-volume", action="store_true", help="在程序末尾追加填充数据以增大体积")
+    parser.add_argument("--padding-size", type=int, help=f"填充数据大小 (MB)，默认 {DEFAULT_PADDING_MB}")
+    parser.add_argument("--padding-fill", choices=PADDING_FILLS, default="random",
+                        help="random：复用缓存的随机数据（不可压缩）；zero：稀疏零填充，几乎不占用 CPU 和磁盘写入")
+    parser.add_argument("--mode", choices=PACKAGE_MODES, help="输出方式：onefile（单文件，每次启动都解压）、"
+                        "onedir（目录）、persistent（单文件，首次启动解压到本机缓存，之后直接启动）")
+    parser.add_argument("--snapshot", action="store_true", help="离线快照：抓取网站并打包进程序，启动时由本机服务器提供")
+    parser.add_argument("--snapshot-depth", type=int, help=f"快照抓取的链接深度，默认 {DEFAULT_SNAPSHOT_DEPTH}")
+    parser.add_argument("--snapshot-scope", choices=SNAPSHOT_SCOPES,
+                        help="快照范围：path（起始页所在目录）或 host（整个站点），默认 host")
+    parser.add_argument("--snapshot-offline", action="store_true", help="快照中没有的内容不再转发到在线网站")
+    parser.add_argument("--compression", choices=list(COMPRESSION_PROFILES),
+                        help="压缩方案：default、none（不压缩）、fast（快速压缩）、small（最小体积）")
+    parser.add_argument("--multi-site", nargs="?", const="Web2EXE", metavar="TITLE",
+                        help="把清单中的所有网址打包成一个多站点启动器，在同一进程中按需打开窗口")
+    parser.add_argument("--idle-unload", type=float, default=0,
+                        help="多站点启动器中最小化超过指定分钟数的窗口会被卸载以释放内存，0 表示不卸载")
+    parser.add_argument("--storage", action="store_true",
+                        help="为每个程序保留独立的内置浏览器数据目录（Cookie、本地存储、HTTP 缓存），之后启动更快")
+    parser.add_argument("--storage-limit", type=int, help=f"浏览器缓存大小上限 (MB)，默认 {DEFAULT_STORAGE_LIMIT_MB}")
+    parser.add_argument("--warmup", choices=WARMUP_MODES,
+                        help="创建窗口的同时预热起始网址：preconnect（解析并连接）或 prefetch（提前请求页面）")
+    parser.add_argument("--slim", action="store_true", help="精简模式：按启动脚本实际导入的模块排除不需要的标准库和 webview 后端")
+    parser.add_argument("--pool", action="store_true", help="常驻打包进程：预先启动 PyInstaller 进程并复用，省去每个任务的启动和导入时间")
+    parser.add_argument("--pool-recycle", type=int, default=DEFAULT_RECYCLE_JOBS, help="每个常驻进程完成多少个任务后重启")
+    parser.add_argument("--preflight", action="store_true",
+                        help="打包前并发检查所有网址（超时、重定向、错误状态码），不可用的网址直接跳过；未指定图标时自动获取网站图标")
+    parser.add_argument("--preflight-timeout", type=float, default=DEFAULT_PREFLIGHT_TIMEOUT, help="预检每个请求的超时时间（秒）")
+    parser.add_argument("--delta", action="store_true",
+                        help="保留每个程序的上一版本，并在输出目录生成与新版本之间的增量更新包（.delta 及 .delta.json 清单）")
+    parser.add_argument("--template", action="store_true", help="模板模式：每种选项组合只打包一次，逐个网址写入配置")
+    parser.add_argument("--watch", action="store_true",
+                        help="监视模式：清单、启动页及其资源、图标变化后自动重新打包有变化的任务，只做必要的步骤（写入配置、更新启动页资源或重新打包）")
+    parser.add_argument("--watch-debounce", type=float, default=DEFAULT_DEBOUNCE, help="监视模式下修改稳定多少秒后开始打包")
+    parser.add_argument("--no-cache", action="store_true", help="不使用构建缓存")
+    parser.add_argument("--cache-size", type=int, default=DEFAULT_CACHE_SIZE_MB, help="构建缓存大小上限 (MB)")
+    parser.add_argument("--keep-temp", action="store_true", help="保留每个任务的临时目录")
+    parser.add_argument("--log-dir", help="每个任务完整日志的保存目录，默认在数据目录的 logs 下按批次创建")
+    parser.add_argument("--report", help="将每个任务的结果写入 JSON 文件")
+    return parser
+
+
+def load_jobs(args):
+    try:
+        jobs = load_manifest(args.manifest)
+    except (OSError, ValueError) as e:
+        raise ValueError(f"无法读取任务清单: {e}")
+    if not jobs:
+        raise ValueError("任务清单中没有网址")
+
+    for job in jobs:
+        if not job.output_dir:
+            job.output_dir = args.output or ""
+        if args.browser:
+            job.use_webview = False
+        if args.icon and not job.icon:
+            job.icon = args.icon
+        if args.winicon and not job.winicon:
+            job.winicon = args.winicon
+        if args.splash and not job.splash_html:
+            job.splash_html = args.splash
+            job.use_splash = True
+        if args.boot_splash:
+            job.boot_splash = True
+        if args.splash_image and not job.splash_image:
+            job.splash_image = args.splash_image
+        if args.increase_volume:
+            job.increase_volume = True
+        if args.padding_size is not None:
+            job.padding_mb = args.padding_size
+        if args.mode:
+            job.package_mode = args.mode
+        if args.compression:
+            job.compression = args.compression
+        if args.snapshot:
+            job.snapshot = True
+        if args.snapshot_depth is not None:
+            job.snapshot_depth = args.snapshot_depth
+        if args.snapshot_scope:
+            job.snapshot_scope = args.snapshot_scope
+        if args.snapshot_offline:
+            job.snapshot_fallthrough = False
+        if args.storage:
+            job.storage = True
+        if args.storage_limit is not None:
+            job.storage_limit_mb = args.storage_limit
+        if args.warmup:
+            job.warmup = args.warmup
+        if not job.output_dir:
+            raise ValueError(f"任务 {job.title} 未指定输出目录（使用 -o 或 output_dir）")
+
+    if args.multi_site:
+        jobs = [multisite_job(jobs, args.multi_site, args.idle_unload)]
+    return jobs
+
+
+def main(argv=None):
+    args = build_arg_parser().parse_args(argv)
+
+    try:
+        jobs = load_jobs(args)
+    except ValueError as e:
+        print(f"错误：{e}", file=sys.stderr)
+        return 2
+
+    pyinstaller = shlex.split(args.pyinstaller) if args.pyinstaller else None
+    engine = BuildEngine(max_workers=args.jobs, pyinstaller=pyinstaller, keep_temp=args.keep_temp,
+                         template_mode=args.template, use_cache=not args.no_cache,
+                         cache_size_mb=args.cache_size, padding_fill=args.padding_fill,
+                         log_dir=args.log_dir, slim=args.slim, splash_inline=args.splash_inline,
+                         preflight=args.preflight, preflight_timeout=args.preflight_timeout, delta=args.delta)
+    if args.pool:
+        engine.pool = engine.make_pool(args.pool_recycle)
+        if engine.pool is not None:
+            engine.pool.prewarm()
+    if args.watch:
+        engine.template_mode = True
+        engine.work_dir = os.path.join(engine.data_dir, "work")
+        try:
+            watch(lambda: load_jobs(args), Watcher(engine, args.watch_debounce))
+        finally:
+            if engine.pool:
+                engine.pool.close()
+        return 0
+    try:
+        results = engine.run(jobs)
+    finally:
+        if engine.pool:
+            engine.pool.close()
+
+    report = [r.to_dict() for r in results]
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    else:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+
+    return 0 if all(r.success for r in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,656 @@
+import os
+import json
+import platform
+from urllib.parse import urlsplit
+
+WARMUP_MODES = ("off", "preconnect", "prefetch")
+DEFAULT_STORAGE_LIMIT_MB = 500
+
+
+TIMING_HELPER = """
+def _web2exe_mark(event):
+    path = os.environ.get('WEB2EXE_TIMING_FILE')
+    if path:
+        import json, time
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps({'event': event, 't': time.time(), 'pid': os.getpid()}) + '\\n')
+
+def _web2exe_watch_window(window):
+    if not os.environ.get('WEB2EXE_TIMING_FILE'):
+        return
+    def on_loaded():
+        _web2exe_mark('window_loaded')
+        if os.environ.get('WEB2EXE_TIMING_EXIT'):
+            window.destroy()
+    getattr(window, 'events', window).loaded += on_loaded
+
+_web2exe_mark('script_start')
+"""
+
+SNAPSHOT_HELPER = """
+_web2exe_last_request = [0.0]
+
+def _web2exe_start_url(url, fallthrough, port):
+    import json, time, zipfile
+    import urllib.request, urllib.error
+    from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+    base_dir = getattr(sys, '_MEIPASS', os.path.dirname(os.path.abspath(__file__)))
+    archive = zipfile.ZipFile(os.path.join(base_dir, 'web2exe_snapshot.zip'))
+    index = json.loads(archive.read('index.json').decode('utf-8'))
+    archive_lock = threading.Lock()
+    skip_headers = ('host', 'connection', 'accept-encoding', 'content-length', 'transfer-encoding')
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, format, *args):
+            pass
+
+        def do_GET(self):
+            self.respond()
+
+        def do_HEAD(self):
+            self.respond()
+
+        def do_POST(self):
+            self.respond()
+
+        def respond(self):
+            _web2exe_last_request[0] = time.time()
+            entry = index['files'].get(self.path) if self.command != 'POST' else None
+            if entry:
+                with archive_lock:
+                    data = archive.read(entry['file'])
+                self.send_response(200)
+                self.send_header('Content-Type', entry['type'])
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                if self.command != 'HEAD':
+                    self.wfile.write(data)
+            elif fallthrough:
+                self.proxy()
+            else:
+                self.send_error(404)
+
+        def proxy(self):
+            length = int(self.headers.get('Content-Length') or 0)
+            body = self.rfile.read(length) if length else None
+            headers = {k: v for k, v in self.headers.items() if k.lower() not in skip_headers}
+            request = urllib.request.Request(index['origin'] + self.path, data=body, headers=headers, method=self.command)
+            try:
+                response = urllib.request.urlopen(request, timeout=30)
+            except urllib.error.HTTPError as e:
+                response = e
+            except OSError:
+                self.send_error(502)
+                return
+            with response:
+                data = response.read()
+                self.send_response(response.code)
+                for k, v in response.headers.items():
+                    if k.lower() not in skip_headers:
+                        self.send_header(k, v)
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                if self.command != 'HEAD':
+                    self.wfile.write(data)
+
+    bind_error = None
+    for candidate in (port, 0):
+        try:
+            server = ThreadingHTTPServer(('127.0.0.1', candidate), Handler)
+            break
+        except OSError as e:
+            bind_error = e
+    else:
+        raise OSError(f"无法启动离线快照服务器: {bind_error}")
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    _web2exe_mark('snapshot_served')
+    return f"http://127.0.0.1:{server.server_address[1]}{index['start']}"
+
+def _web2exe_serve_until_idle(idle_seconds=600):
+    import time
+    _web2exe_last_request[0] = time.time()
+    while time.time() - _web2exe_last_request[0] < idle_seconds:
+        time.sleep(5)
+"""
+
+STORAGE_HELPER = """
+def _web2exe_storage_dir(app_id):
+    root = os.environ.get('WEB2EXE_WEBVIEW_DATA')
+    if not root:
+        base = os.environ.get('LOCALAPPDATA') or os.path.join(os.path.expanduser('~'), '.cache')
+        root = os.path.join(base, 'Web2EXE', 'webview')
+    return os.path.join(root, app_id)
+
+def _web2exe_start_args(storage):
+    if not storage:
+        return {}
+    path = _web2exe_storage_dir(storage['id'])
+    os.makedirs(path, exist_ok=True)
+    return {'private_mode': False, 'storage_path': path}
+
+def _web2exe_trim_storage(storage):
+    # Runs after the last window closes so sizing the profile never delays startup. Only cache folders are
+    # trimmed (oldest first); cookies and local storage are kept.
+    if not storage:
+        return
+    path = _web2exe_storage_dir(storage['id'])
+    files, total = [], 0
+    for dirpath, _, names in os.walk(path):
+        cache = 'cache' in os.path.relpath(dirpath, path).lower()
+        for name in names:
+            file_path = os.path.join(dirpath, name)
+            try:
+                st = os.stat(file_path)
+            except OSError:
+                continue
+            total += st.st_size
+            if cache:
+                files.append((st.st_mtime, st.st_size, file_path))
+    limit = storage['limit_mb'] * 1024 * 1024
+    for _, size, file_path in sorted(files):
+        if total <= limit:
+            break
+        try:
+            os.remove(file_path)
+            total -= size
+        except OSError:
+            pass
+
+def _web2exe_warmup(url, mode):
+    # Resolves (and for prefetch, requests) the start URL while the window is still being created, so the
+    # OS DNS cache and the server side are warm by the time the webview asks for the page.
+    if mode not in ('preconnect', 'prefetch'):
+        return
+    def run():
+        import socket, urllib.request
+        from urllib.parse import urlsplit
+        parts = urlsplit(url)
+        try:
+            if mode == 'prefetch':
+                request = urllib.request.Request(url, headers={'User-Agent': 'Mozilla/5.0 Web2EXE'})
+                with urllib.request.urlopen(request, timeout=10) as response:
+                    response.read()
+            else:
+                port = parts.port or (443 if parts.scheme == 'https' else 80)
+                socket.create_connection((parts.hostname, port), timeout=5).close()
+        except Exception:
+            pass
+        _web2exe_mark('warmup_done')
+    threading.Thread(target=run, daemon=True).start()
+"""
+
+
+BOOT_SPLASH_HELPER = """
+BOOT_SPLASH_TIMEOUT = 30
+
+def _web2exe_close_boot_splash(*args):
+    try:
+        import pyi_splash
+        pyi_splash.close()
+    except Exception:
+        pass
+    _web2exe_mark('boot_splash_closed')
+
+_web2exe_boot_splash_timer = threading.Timer(BOOT_SPLASH_TIMEOUT, _web2exe_close_boot_splash)
+_web2exe_boot_splash_timer.daemon = True
+_web2exe_boot_splash_timer.start()
+"""
+
+
+def storage_id(title, url):
+    import hashlib
+    name = "".join(ch if ch.isalnum() or ch in "-_." else "_" for ch in title)[:40] or "app"
+    return f"{name}-{hashlib.sha1(url.encode('utf-8')).hexdigest()[:8]}"
+
+
+def build_startup_script_content(url, title, company_name, winicon_path_clean, use_webview_flag, use_custom_splash, splash_html_path_param, snapshot=None, storage=None, warmup=None, boot_splash=False):
+    
+    use_html_splash_only = use_custom_splash and bool(splash_html_path_param) and os.path.exists(splash_html_path_param)
+
+    imports = [
+        "import sys",
+        "import platform",
+        "import os",
+        "import threading"
+    ]
+    if use_html_splash_only:
+        imports.append("import tkinter as tk")
+
+    if use_webview_flag:
+        imports.append("import webview")
+        if platform.system() == 'Windows':
+            imports.append("import ctypes")
+    else:
+        imports.append("import webbrowser")
+
+    imports_str = "\n".join(imports)
+
+    startup_script_body = ""
+    webview_url = f'"{url}"'
+    browser_url = f"'{url}'"
+    snapshot_launch = ""
+    snapshot_wait = ""
+    splash_snapshot_wait = ""
+    if snapshot:
+        snapshot_args = f'{bool(snapshot["fallthrough"])!r}, {int(snapshot["port"])!r}'
+        webview_url = browser_url = f'_web2exe_start_url("{url}", {snapshot_args})'
+        snapshot_launch = f'\n        url = _web2exe_start_url(url, {snapshot_args})'
+        snapshot_wait = "\n    _web2exe_serve_until_idle()"
+        splash_snapshot_wait = "\n            _web2exe_serve_until_idle()"
+
+    storage = storage if use_webview_flag else None
+    warmup = warmup if use_webview_flag and warmup in ("preconnect", "prefetch") and not snapshot else None
+    boot_splash = boot_splash and not use_html_splash_only
+    boot_splash_hook = ""
+    boot_splash_close = ""
+    if boot_splash:
+        boot_splash_hook = "\n    getattr(window, 'events', window).loaded += _web2exe_close_boot_splash"
+        boot_splash_close = "\n    _web2exe_close_boot_splash()"
+
+    start_args = ""
+    splash_start_args = ""
+    storage_trim = ""
+    warmup_call = ""
+    if storage:
+        start_args = f"**_web2exe_start_args({storage!r})"
+        splash_start_args = ", " + start_args
+        storage_trim = f"\n    _web2exe_trim_storage({storage!r})"
+    if warmup:
+        warmup_call = f"\n    _web2exe_warmup({url!r}, {warmup!r})"
+
+    if use_html_splash_only: 
+        splash_filename = os.path.basename(splash_html_path_param)
+        
+        startup_script_body = f"""
+class Api:
+    def close_splash_and_launch(self, url, title, winicon_param, use_webview_flag_js):
+        global splash_window
+        if splash_window:
+            splash_window.destroy()
+            splash_window = None{snapshot_launch}
+
+        if use_webview_flag_js:
+            if platform.system() == 'Windows' and winicon_param:
+                try:
+                    ctypes.windll.shell32.SetCurrentProcessExplicitAppUserModelID('myappid')
+                except AttributeError:
+                    pass
+            main_window = webview.create_window(title, url, width=1024, height=720) 
+            _web2exe_watch_window(main_window)
+            webview.start()
+        else:
+            webbrowser.open(url)
+            _web2exe_mark('browser_opened'){splash_snapshot_wait}
+            sys.exit()
+
+if __name__ == '__main__':
+    global splash_window{warmup_call}
+    root = tk.Tk()
+    root.withdraw()
+
+    splash_window = webview.create_window('Loading...', f"file://{{os.path.join(sys._MEIPASS, '{splash_filename}')}}", 
+                                          width=500, height=300, frameless=True, resizable=False, easy_drag=True, 
+                                          js_api=Api(), hidden=True)
+
+    def on_splash_loaded():
+        screen_width = webview.screens[0].width if webview.screens else root.winfo_screenwidth()
+        screen_height = webview.screens[0].height if webview.screens else root.winfo_screenheight()
+        
+        splash_window.move((screen_width - 500) // 2, (screen_height - 300) // 2)
+        splash_window.show()
+        _web2exe_mark('splash_shown')
+        
+    splash_window.loaded += on_splash_loaded
+    
+    webview.start(splash_window, gui='tk', debug=False{splash_start_args}){storage_trim}
+"""
+    else:
+        if use_webview_flag:
+            icon_code = ""
+            if platform.system() == 'Windows' and winicon_path_clean:
+                icon_code = "import ctypes\ntry:\n    ctypes.windll.shell32.SetCurrentProcessExplicitAppUserModelID('myappid')\nexcept AttributeError: pass"
+            startup_script_body = f"""
+import webview
+{icon_code}
+if __name__ == '__main__':{warmup_call}
+    window = webview.create_window("{title}", {webview_url}, width=1024, height=720) 
+    _web2exe_watch_window(window){boot_splash_hook}
+    webview.start({start_args}){storage_trim}
+"""
+        else:
+            startup_script_body = f"""
+import webbrowser
+import sys
+if __name__ == '__main__':
+    webbrowser.open({browser_url})
+    _web2exe_mark('browser_opened'){boot_splash_close}{snapshot_wait}
+    sys.exit()
+"""
+    helpers = (TIMING_HELPER + (SNAPSHOT_HELPER if snapshot else "") + (STORAGE_HELPER if storage or warmup else "")
+               + (BOOT_SPLASH_HELPER if boot_splash else ""))
+    return imports_str + "\n" + helpers + startup_script_body
+
+
+MULTISITE_LAUNCHER = """
+SITE_TABLE_HTML = '''<!DOCTYPE html>
+<html><head><meta charset="utf-8"><style>
+body{font-family:"Microsoft YaHei",sans-serif;margin:0;padding:16px;background:#f5f6f8}
+table{width:100%;border-collapse:collapse;background:#fff}
+td{padding:8px 10px;border-bottom:1px solid #e3e5e8}
+.url{color:#888;font-size:12px}.state{color:#2a7;width:60px}
+button{padding:4px 14px}
+</style></head><body><table id="sites"></table><script>
+function render(sites){
+  var table=document.getElementById('sites');table.innerHTML='';
+  sites.forEach(function(site,i){
+    var row=table.insertRow(),name=row.insertCell(),state=row.insertCell(),action=row.insertCell();
+    name.textContent=site.title;var url=document.createElement('div');url.className='url';url.textContent=site.url;name.appendChild(url);
+    state.className='state';state.textContent=site.state;
+    var button=document.createElement('button');button.textContent=site.state=='已打开'?'切换':'打开';
+    button.onclick=function(){pywebview.api.open_site(i).then(refresh)};action.appendChild(button);
+  });
+}
+function refresh(){pywebview.api.sites().then(render)}
+window.addEventListener('pywebviewready',function(){refresh();setInterval(refresh,2000)});
+</script></body></html>'''
+
+
+class SiteTable:
+    def __init__(self):
+        self._windows = {}
+        self._minimized = {}
+        self._unloaded = set()
+        self._lock = threading.Lock()
+
+    def sites(self):
+        with self._lock:
+            return [{'title': site['title'], 'url': site['url'],
+                     'state': '已打开' if i in self._windows else ('已卸载' if i in self._unloaded else '')}
+                    for i, site in enumerate(SITES)]
+
+    def open_site(self, index):
+        index = int(index)
+        with self._lock:
+            window = self._windows.get(index)
+        if window is not None:
+            window.restore()
+            window.show()
+            return
+        site = SITES[index]
+        window = webview.create_window(site['title'], site['url'], width=1024, height=720)
+        with self._lock:
+            self._windows[index] = window
+            self._unloaded.discard(index)
+        window.events.closed += lambda: self._forget(index, window)
+        window.events.minimized += lambda: self._set_minimized(index, time.time())
+        window.events.restored += lambda: self._set_minimized(index, None)
+        _web2exe_mark('site_opened')
+
+    def _set_minimized(self, index, since):
+        with self._lock:
+            self._minimized[index] = since
+
+    def _forget(self, index, window):
+        with self._lock:
+            if self._windows.get(index) is window:
+                del self._windows[index]
+                self._minimized.pop(index, None)
+
+    def _unload_idle(self):
+        # A minimized page still holds its renderer; closing it frees the memory and the table can reopen it.
+        while True:
+            time.sleep(min(30, IDLE_SECONDS))
+            now = time.time()
+            with self._lock:
+                idle = [(i, self._windows[i]) for i, since in self._minimized.items()
+                        if since and now - since >= IDLE_SECONDS and i in self._windows]
+                self._unloaded.update(i for i, _ in idle)
+            for _, window in idle:
+                window.destroy()
+
+    def _close_all(self):
+        with self._lock:
+            windows = list(self._windows.values())
+        for window in windows:
+            window.destroy()
+
+    def _startup(self):
+        for arg in sys.argv[1:]:
+            for i, site in enumerate(SITES):
+                if arg in (str(i + 1), site['title']):
+                    self.open_site(i)
+        if IDLE_SECONDS:
+            self._unload_idle()
+
+
+if __name__ == '__main__':
+    if platform.system() == 'Windows' and WINICON:
+        try:
+            ctypes.windll.shell32.SetCurrentProcessExplicitAppUserModelID('myappid')
+        except AttributeError:
+            pass
+    api = SiteTable()
+    table = webview.create_window(APP_TITLE, html=SITE_TABLE_HTML, js_api=api, width=640, height=480)
+    table.events.closed += api._close_all
+    _web2exe_watch_window(table)
+    webview.start(api._startup, **_web2exe_start_args(STORAGE))
+    _web2exe_trim_storage(STORAGE)
+"""
+
+
+def site_title(url):
+    parts = urlsplit(url)
+    return (parts.netloc + parts.path.rstrip("/")) or url
+
+
+def normalize_sites(sites):
+    normalized = []
+    for site in sites:
+        if isinstance(site, str):
+            site = {"url": site}
+        url = (site.get("url") or "").strip()
+        if not url:
+            raise ValueError("多站点列表中的每一项都需要 url")
+        normalized.append({"title": site.get("title") or site_title(url), "url": url})
+    return normalized
+
+
+def build_multisite_script_content(sites, title, winicon_path_clean, idle_minutes=0, storage=None):
+    imports = [
+        "import sys",
+        "import platform",
+        "import os",
+        "import threading",
+        "import json",
+        "import time",
+        "import webview"
+    ]
+    if platform.system() == 'Windows':
+        imports.append("import ctypes")
+
+    config = (f"\nSITES = json.loads({json.dumps(normalize_sites(sites), ensure_ascii=False)!r})\n"
+              f"APP_TITLE = {title!r}\n"
+              f"WINICON = {bool(winicon_path_clean)!r}\n"
+              f"IDLE_SECONDS = {max(0, int(idle_minutes * 60))!r}\n"
+              f"STORAGE = {storage!r}\n")
+    return "\n".join(imports) + "\n" + TIMING_HELPER + STORAGE_HELPER + config + MULTISITE_LAUNCHER
+
+
+TEMPLATE_LOADER = """
+PAYLOAD_MAGIC = {magic!r}
+
+def load_payload(read_blob=True):
+    import json, struct
+    with open(sys.executable, 'rb') as f:
+        f.seek(0, 2)
+        size = f.tell()
+        tail_size = min(size, 4096)
+        f.seek(size - tail_size)
+        tail = f.read(tail_size)
+        pos = tail.rfind(PAYLOAD_MAGIC)
+        if pos < 8:
+            raise SystemExit('Web2EXE: 未找到启动配置')
+        config_len, blob_len = struct.unpack('<II', tail[pos - 8:pos])
+        f.seek(size - tail_size + pos - 8 - blob_len - config_len)
+        config = json.loads(f.read(config_len).decode('utf-8'))
+        blob = f.read(blob_len) if read_blob else b''
+    return config, blob
+"""
+
+
+def build_template_launcher_content(use_webview_flag, use_custom_splash, payload_magic):
+    imports = [
+        "import sys",
+        "import platform",
+        "import os",
+        "import threading"
+    ]
+    if use_custom_splash:
+        imports += ["import tkinter as tk", "import io", "import zipfile", "import tempfile", "import shutil", "import atexit"]
+
+    if use_webview_flag or use_custom_splash:
+        imports.append("import webview")
+        if platform.system() == 'Windows':
+            imports.append("import ctypes")
+    if not use_webview_flag or use_custom_splash:
+        imports.append("import webbrowser")
+
+    startup_script_body = TEMPLATE_LOADER.format(magic=payload_magic)
+
+    if use_custom_splash:
+        startup_script_body += """
+class Api:
+    def close_splash_and_launch(self, url, title, winicon_param, use_webview_flag_js):
+        global splash_window
+        if splash_window:
+            splash_window.destroy()
+            splash_window = None
+
+        if use_webview_flag_js:
+            if platform.system() == 'Windows' and winicon_param:
+                try:
+                    ctypes.windll.shell32.SetCurrentProcessExplicitAppUserModelID('myappid')
+                except AttributeError:
+                    pass
+            main_window = webview.create_window(title, url, width=1024, height=720) 
+            _web2exe_watch_window(main_window)
+            webview.start()
+        else:
+            webbrowser.open(url)
+            _web2exe_mark('browser_opened')
+            sys.exit()
+
+if __name__ == '__main__':
+    global splash_window
+    config, blob = load_payload()
+    _web2exe_warmup(config['url'], config.get('warmup'))
+    splash_dir = tempfile.mkdtemp(prefix='web2exe_splash_')
+    atexit.register(shutil.rmtree, splash_dir, True)
+    with zipfile.ZipFile(io.BytesIO(blob)) as archive:
+        archive.extractall(splash_dir)
+
+    root = tk.Tk()
+    root.withdraw()
+
+    splash_window = webview.create_window('Loading...', f"file://{os.path.join(splash_dir, config['splash'])}", 
+                                          width=500, height=300, frameless=True, resizable=False, easy_drag=True, 
+                                          js_api=Api(), hidden=True)
+
+    def on_splash_loaded():
+        screen_width = webview.screens[0].width if webview.screens else root.winfo_screenwidth()
+        screen_height = webview.screens[0].height if webview.screens else root.winfo_screenheight()
+        
+        splash_window.move((screen_width - 500) // 2, (screen_height - 300) // 2)
+        splash_window.show()
+        _web2exe_mark('splash_shown')
+        
+    splash_window.loaded += on_splash_loaded
+    
+    webview.start(splash_window, gui='tk', debug=False, **_web2exe_start_args(config.get('storage')))
+    _web2exe_trim_storage(config.get('storage'))
+"""
+    elif use_webview_flag:
+        startup_script_body += """
+if __name__ == '__main__':
+    config, _ = load_payload()
+    _web2exe_warmup(config['url'], config.get('warmup'))
+    if platform.system() == 'Windows' and config.get('winicon'):
+        try:
+            ctypes.windll.shell32.SetCurrentProcessExplicitAppUserModelID('myappid')
+        except AttributeError:
+            pass
+    window = webview.create_window(config['title'], config['url'], width=1024, height=720) 
+    _web2exe_watch_window(window)
+    webview.start(**_web2exe_start_args(config.get('storage')))
+    _web2exe_trim_storage(config.get('storage'))
+"""
+    else:
+        startup_script_body += """
+if __name__ == '__main__':
+    config, _ = load_payload()
+    webbrowser.open(config['url'])
+    _web2exe_mark('browser_opened')
+    sys.exit()
+"""
+    helpers = TIMING_HELPER + (STORAGE_HELPER if use_webview_flag or use_custom_splash else "")
+    return "\n".join(imports) + "\n" + helpers + startup_script_body
+
+
+def build_persistent_stub_content(payload_magic):
+    imports = [
+        "import sys",
+        "import os",
+        "import io",
+        "import shutil",
+        "import zipfile",
+        "import tempfile",
+        "import subprocess"
+    ]
+
+    startup_script_body = TEMPLATE_LOADER.format(magic=payload_magic) + """
+def cache_root():
+    if os.environ.get('WEB2EXE_APP_CACHE'):
+        return os.environ['WEB2EXE_APP_CACHE']
+    base = os.environ.get('LOCALAPPDATA') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'Web2EXE', 'apps')
+
+def extract(config, target):
+    root = os.path.dirname(target)
+    os.makedirs(root, exist_ok=True)
+    _, blob = load_payload()
+    tmp_dir = tempfile.mkdtemp(prefix=config['id'] + '.', dir=root)
+    with zipfile.ZipFile(io.BytesIO(blob)) as archive:
+        archive.extractall(tmp_dir)
+    if sys.platform != 'win32':
+        os.chmod(os.path.join(tmp_dir, config['exe']), 0o755)
+    open(os.path.join(tmp_dir, '.complete'), 'w').close()
+    try:
+        os.replace(tmp_dir, target)
+    except OSError:
+        shutil.rmtree(tmp_dir, True)
+    _web2exe_mark('extracted')
+
+    for entry in os.listdir(root):
+        suffix = entry[len(config['name']) + 1:]
+        if entry.startswith(config['name'] + '-') and len(suffix) == 16 and entry != config['id']:
+            shutil.rmtree(os.path.join(root, entry), True)
+
+if __name__ == '__main__':
+    config, _ = load_payload(read_blob=False)
+    target = os.path.join(cache_root(), config['id'])
+    if not os.path.exists(os.path.join(target, '.complete')):
+        extract(config, target)
+
+    exe = os.path.join(target, config['exe'])
+    env = dict(os.environ, PYINSTALLER_RESET_ENVIRONMENT='1')
+    env.pop('_MEIPASS2', None)
+    if sys.platform == 'win32':
+        subprocess.Popen([exe] + sys.argv[1:], env=env, close_fds=True)
+        sys.exit(0)
+    os.execve(exe, [exe] + sys.argv[1:], env)
+"""
+    return "\n".join(imports) + "\n" + TIMING_HELPER + startup_script_body
@@ -0,0 +1,34 @@
+import queue
+
+LOG_TICK_MS = 100
+LOG_MAX_LINES = 2000
+DRAIN_MAX_ITEMS = 20000
+
+
+class LogBus:
+    def __init__(self):
+        self._queue = queue.SimpleQueue()
+
+    def log(self, message):
+        self._queue.put(("log", message))
+
+    def status(self, text):
+        self._queue.put(("status", text))
+
+    def call(self, func, *args):
+        self._queue.put(("call", (func, args)))
+
+    def drain(self, max_items=DRAIN_MAX_ITEMS):
+        lines, status, calls = [], None, []
+        for _ in range(max_items):
+            try:
+                kind, payload = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if kind == "log":
+                lines.append(payload)
+            elif kind == "status":
+                status = payload
+            else:
+                calls.append(payload)
+        return lines, status, calls
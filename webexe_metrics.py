@@ -0,0 +1,180 @@
+import os, re, csv, json, heapq, threading
+import time
+import statistics
+
+PHASES = ("prepare", "snapshot", "stamp", "bundle", "cache", "analysis", "pyz", "pkg", "exe", "collect", "post", "padding", "delta", "finish")
+
+PYINSTALLER_PHASES = [
+    (re.compile(r"INFO: (Running|Building) Analysis"), "analysis"),
+    (re.compile(r"INFO: Building PYZ \("), "pyz"),
+    (re.compile(r"INFO: Building PKG \("), "pkg"),
+    (re.compile(r"INFO: Building EXE from"), "exe"),
+    (re.compile(r"INFO: Building COLLECT"), "collect"),
+]
+
+HISTORY_LIMIT = 20
+CSV_FIELDS = ["time", "name", "profile", "success", "cached", "total"] + list(PHASES)
+
+
+def pyinstaller_phase(line):
+    for pattern, phase in PYINSTALLER_PHASES:
+        if pattern.search(line):
+            return phase
+    return None
+
+
+def format_duration(seconds):
+    if seconds is None:
+        return "--:--:--"
+    hours, remainder = divmod(int(max(0, seconds)), 3600)
+    minutes, seconds = divmod(remainder, 60)
+    return f"{hours:02}:{minutes:02}:{seconds:02}"
+
+
+class PhaseTimer:
+    def __init__(self, name, profile):
+        self.name = name
+        self.profile = profile
+        self.started = time.time()
+        self.phases = {}
+        self.current = None
+        self.current_started = None
+        self.cached = False
+        self._lock = threading.Lock()
+
+    def phase(self, name):
+        with self._lock:
+            if name == self.current:
+                return
+            self._close(time.time())
+            self.current = name
+            self.current_started = time.time()
+
+    def feed(self, line):
+        phase = pyinstaller_phase(line)
+        if phase:
+            self.phase(phase)
+
+    def stop(self):
+        with self._lock:
+            self._close(time.time())
+            self.current = None
+        return self.total()
+
+    def _close(self, now):
+        if self.current is not None:
+            self.phases[self.current] = self.phases.get(self.current, 0.0) + now - self.current_started
+
+    def total(self):
+        return time.time() - self.started
+
+    def snapshot(self):
+        with self._lock:
+            phases = dict(self.phases)
+            if self.current is not None:
+                phases[self.current] = phases.get(self.current, 0.0) + time.time() - self.current_started
+            return self.current, phases
+
+    def to_dict(self, success):
+        return {
+            "time": round(self.started, 3),
+            "name": self.name,
+            "profile": self.profile,
+            "success": success,
+            "cached": self.cached,
+            "total": round(self.total(), 3),
+            "phases": {name: round(seconds, 3) for name, seconds in self.phases.items()},
+        }
+
+
+class MetricsStore:
+    def __init__(self, metrics_dir):
+        self.metrics_dir = metrics_dir
+        self.history_path = os.path.join(metrics_dir, "history.jsonl")
+        self.csv_path = os.path.join(metrics_dir, "history.csv")
+        self._lock = threading.Lock()
+        self._history = None
+
+    def history(self):
+        with self._lock:
+            if self._history is None:
+                self._history = []
+                try:
+                    with open(self.history_path, encoding="utf-8") as f:
+                        for line in f:
+                            try:
+                                self._history.append(json.loads(line))
+                            except ValueError:
+                                pass
+                except OSError:
+                    pass
+            return list(self._history)
+
+    def record(self, record, job_path=None):
+        self.history()
+        with self._lock:
+            os.makedirs(self.metrics_dir, exist_ok=True)
+            with open(self.history_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            new_csv = not os.path.exists(self.csv_path)
+            if not new_csv:
+                with open(self.csv_path, encoding="utf-8") as f:
+                    if f.readline().strip() != ",".join(CSV_FIELDS):
+                        os.replace(self.csv_path, self.csv_path[:-4] + time.strftime("-%Y%m%d-%H%M%S.csv"))
+                        new_csv = True
+            with open(self.csv_path, "a", encoding="utf-8", newline="") as f:
+                writer = csv.DictWriter(f, CSV_FIELDS)
+                if new_csv:
+                    writer.writeheader()
+                row = {k: record[k] for k in CSV_FIELDS if k in record}
+                row.update(record["phases"])
+                writer.writerow(row)
+            self._history.append(record)
+        if job_path:
+            os.makedirs(os.path.dirname(job_path), exist_ok=True)
+            with open(job_path, "w", encoding="utf-8") as f:
+                json.dump(record, f, ensure_ascii=False, indent=2)
+
+    def phase_estimates(self, profile):
+        records = [r for r in self.history() if r.get("success") and not r.get("cached")]
+        matching = [r for r in records if r.get("profile") == profile][-HISTORY_LIMIT:]
+        if not matching:
+            matching = records[-HISTORY_LIMIT:]
+        estimates = {}
+        for phase in PHASES:
+            samples = [r["phases"][phase] for r in matching if phase in r.get("phases", {})]
+            if samples:
+                estimates[phase] = statistics.median(samples)
+        return estimates
+
+    def estimate(self, profile, padding=False):
+        estimates = self.phase_estimates(profile)
+        if not estimates:
+            return None
+        return sum(seconds for phase, seconds in estimates.items() if padding or phase != "padding")
+
+    def remaining(self, timer, padding=False):
+        estimates = self.phase_estimates(timer.profile)
+        if not estimates:
+            return None
+        current, phases = timer.snapshot()
+        if current is None:
+            return 0.0
+        remaining = max(0.0, estimates.get(current, 0.0) - phases.get(current, 0.0))
+        for phase in PHASES[PHASES.index(current) + 1:]:
+            if phase == "padding" and not padding:
+                continue
+            remaining += estimates.get(phase, 0.0)
+        return remaining
+
+
+def batch_remaining(running, queued, workers):
+    # Greedy list scheduling: queued jobs start on whichever worker frees up first.
+    if any(seconds is None for seconds in list(running) + list(queued)):
+        return None
+    slots = sorted(running)[:workers]
+    slots += [0.0] * (workers - len(slots))
+    heapq.heapify(slots)
+    for seconds in queued:
+        heapq.heappush(slots, heapq.heappop(slots) + seconds)
+    return max(slots) if slots else 0.0
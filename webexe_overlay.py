@@ -0,0 +1,84 @@
+import os, struct, shutil
+
+# PyInstaller's CArchive cookie (PyInstaller.archive.writers.CArchiveWriter). On Windows the PKG is
+# appended to the bootloader and the bootloader finds it by scanning backwards for this cookie, so
+# anything we append after the build must be followed by a relocated copy of the cookie.
+COOKIE_MAGIC = b'MEI\014\013\012\013\016'
+COOKIE_FORMAT = '!8sIIII64s'
+COOKIE_LENGTH = struct.calcsize(COOKIE_FORMAT)
+
+PAYLOAD_MAGIC = b'WEB2EXE\x00CFG\x01'
+PAYLOAD_TRAILER_FORMAT = '<II'
+
+COPY_BUFFER_SIZE = 8 * 1024 * 1024
+
+
+def read_trailing_cookie(path):
+    size = os.path.getsize(path)
+    if size < COOKIE_LENGTH:
+        return None
+    with open(path, "rb") as f:
+        f.seek(size - COOKIE_LENGTH)
+        data = f.read(COOKIE_LENGTH)
+    if not data.startswith(COOKIE_MAGIC):
+        return None
+    return struct.unpack(COOKIE_FORMAT, data)
+
+
+def pkg_offset(path):
+    cookie = read_trailing_cookie(path)
+    if cookie is None:
+        return None
+    return os.path.getsize(path) - cookie[1]
+
+
+def append_overlay(path, chunks):
+    cookie = read_trailing_cookie(path)
+    with open(path, "r+b") as f:
+        f.seek(0, 2)
+        start = f.tell()
+        for chunk in chunks:
+            if callable(chunk):
+                chunk(f)
+            else:
+                f.write(chunk)
+        end = f.tell()
+        if cookie is not None:
+            magic, archive_length, toc_offset, toc_length, pyvers, pylib = cookie
+            archive_length += end - start + COOKIE_LENGTH
+            f.write(struct.pack(COOKIE_FORMAT, magic, archive_length, toc_offset, toc_length, pyvers, pylib))
+    return end - start
+
+
+def pack_payload(config_bytes, blob=b""):
+    return config_bytes + blob + struct.pack(PAYLOAD_TRAILER_FORMAT, len(config_bytes), len(blob)) + PAYLOAD_MAGIC
+
+
+def payload_file_chunks(config_bytes, blob_path):
+    blob_size = os.path.getsize(blob_path)
+
+    def write_blob(f):
+        with open(blob_path, "rb") as src:
+            shutil.copyfileobj(src, f, COPY_BUFFER_SIZE)
+
+    return [config_bytes, write_blob, struct.pack(PAYLOAD_TRAILER_FORMAT, len(config_bytes), blob_size) + PAYLOAD_MAGIC]
+
+
+def copy_file(src, dst, limit=None):
+    with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+        if limit is None:
+            shutil.copyfileobj(fsrc, fdst, COPY_BUFFER_SIZE)
+            return
+        remaining = limit
+        while remaining > 0:
+            chunk = fsrc.read(min(COPY_BUFFER_SIZE, remaining))
+            if not chunk:
+                break
+            fdst.write(chunk)
+            remaining -= len(chunk)
+
+
+def append_file(dst, src, offset=0):
+    with open(src, "rb") as fsrc, open(dst, "ab") as fdst:
+        fsrc.seek(offset)
+        shutil.copyfileobj(fsrc, fdst, COPY_BUFFER_SIZE)
@@ -0,0 +1,88 @@
+import os, sys, threading
+
+from webexe_overlay import COPY_BUFFER_SIZE, append_overlay
+
+DEFAULT_PADDING_MB = 300
+PADDING_FILLS = ("random", "zero")
+
+_pad_lock = threading.Lock()
+
+
+def _set_sparse(f):
+    if sys.platform != "win32":
+        return
+    try:
+        import ctypes, msvcrt
+        from ctypes import wintypes
+        FSCTL_SET_SPARSE = 0x900C4
+        returned = wintypes.DWORD()
+        ctypes.windll.kernel32.DeviceIoControl(
+            wintypes.HANDLE(msvcrt.get_osfhandle(f.fileno())), FSCTL_SET_SPARSE,
+            None, 0, None, 0, ctypes.byref(returned), None)
+    except (ImportError, OSError, AttributeError):
+        pass
+
+
+def _copy_range(src, dst, size):
+    offset = 0
+    dst.flush()
+    if hasattr(os, "copy_file_range"):
+        try:
+            while offset < size:
+                copied = os.copy_file_range(src.fileno(), dst.fileno(), size - offset, offset)
+                if copied == 0:
+                    break
+                offset += copied
+            dst.seek(0, 2)
+            if offset == size:
+                return
+        except OSError:
+            dst.seek(0, 2)
+    src.seek(offset)
+    remaining = size - offset
+    while remaining > 0:
+        chunk = src.read(min(COPY_BUFFER_SIZE, remaining))
+        if not chunk:
+            raise IOError("填充文件长度不足")
+        dst.write(chunk)
+        remaining -= len(chunk)
+
+
+def random_pad_path(pad_dir, size_bytes):
+    path = os.path.join(pad_dir, f"random-{size_bytes}.bin")
+    with _pad_lock:
+        if os.path.exists(path) and os.path.getsize(path) == size_bytes:
+            return path
+        os.makedirs(pad_dir, exist_ok=True)
+        tmp_path = f"{path}.tmp-{os.getpid()}"
+        with open(tmp_path, "wb") as f:
+            remaining = size_bytes
+            while remaining > 0:
+                chunk = os.urandom(min(COPY_BUFFER_SIZE, remaining))
+                f.write(chunk)
+                remaining -= len(chunk)
+        os.replace(tmp_path, path)
+    return path
+
+
+def padding_writer(size_bytes, fill="random", pad_dir=None):
+    if fill not in PADDING_FILLS:
+        raise ValueError(f"未知的填充方式: {fill}")
+
+    def write(f):
+        if size_bytes <= 0:
+            return
+        if fill == "zero":
+            _set_sparse(f)
+            end = f.tell() + size_bytes
+            f.truncate(end)
+            f.seek(end)
+        else:
+            with open(random_pad_path(pad_dir, size_bytes), "rb") as src:
+                _copy_range(src, f, size_bytes)
+
+    return write
+
+
+def append_padding(path, size_bytes, fill="random", pad_dir=None):
+    return append_overlay(path, [padding_writer(size_bytes, fill, pad_dir)])
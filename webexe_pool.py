@@ -0,0 +1,176 @@
+import os, sys, json, subprocess, threading
+import argparse
+
+# Warm PyInstaller workers: long-lived interpreters that keep PyInstaller and its hook machinery imported and
+# run builds through PyInstaller.__main__.run. PyInstaller caches the base module graph per process, so every
+# build after the first on a worker skips that analysis. Workers only use the standard library and PyInstaller
+# because they run under the Python that owns the configured PyInstaller, not necessarily ours.
+
+DONE_SENTINEL = "\x00web2exe-done "
+DEFAULT_RECYCLE_JOBS = 20
+
+
+def worker_main(max_jobs):
+    # Everything (our prints, PyInstaller's logging, isolated hook subprocesses) goes to stderr so the parent
+    # reads a single ordered stream; the sentinel marks the end of one build.
+    os.dup2(2, 1)
+    sys.stdout = sys.stderr
+    import PyInstaller.__main__
+    import PyInstaller.building.build_main  # noqa: F401
+    import PyInstaller.depend.analysis  # noqa: F401
+    from PyInstaller.archive.writers import ZlibArchiveWriter, CArchiveWriter
+
+    def set_levels(levels):
+        ZlibArchiveWriter._COMPRESSION_LEVEL, CArchiveWriter._COMPRESSION_LEVEL = levels
+
+    default_levels = [ZlibArchiveWriter._COMPRESSION_LEVEL, CArchiveWriter._COMPRESSION_LEVEL]
+
+    for _ in range(max_jobs):
+        line = sys.stdin.readline()
+        if not line:
+            break
+        request = json.loads(line)
+        saved_env = dict(os.environ)
+        os.environ.update(request.get("env") or {})
+        set_levels(request.get("levels") or default_levels)
+        try:
+            PyInstaller.__main__.run(request["args"])
+            returncode = 0
+        except SystemExit as e:
+            returncode = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+            if not isinstance(e.code, (int, type(None))):
+                sys.stderr.write(f"{e.code}\n")
+        except BaseException:
+            import traceback
+            traceback.print_exc()
+            returncode = 1
+        finally:
+            os.environ.clear()
+            os.environ.update(saved_env)
+            set_levels(default_levels)
+        sys.stderr.write(f"{DONE_SENTINEL}{returncode}\n")
+        sys.stderr.flush()
+
+
+class PoolWorker:
+    def __init__(self, python, max_jobs):
+        self.jobs = 0
+        self.max_jobs = max_jobs
+        self.process = subprocess.Popen(
+            [python, os.path.abspath(__file__), "--worker", "--max-jobs", str(max_jobs)],
+            stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+            text=True, encoding="utf-8", errors="replace", bufsize=1)
+
+    def alive(self):
+        return self.process.poll() is None
+
+    def run(self, args, on_line, env=None, levels=None):
+        self.jobs += 1
+        self.process.stdin.write(json.dumps({"args": args, "env": env or {}, "levels": levels}) + "\n")
+        self.process.stdin.flush()
+        for line in iter(self.process.stderr.readline, ""):
+            if line.startswith(DONE_SENTINEL):
+                return int(line[len(DONE_SENTINEL):])
+            on_line(line)
+        return self.process.wait() or 1
+
+    def close(self):
+        try:
+            self.process.stdin.close()
+        except OSError:
+            pass
+        try:
+            self.process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+
+    def kill(self):
+        if self.alive():
+            self.process.kill()
+            self.process.wait()
+
+
+class WorkerPool:
+    def __init__(self, python, size, recycle_jobs=DEFAULT_RECYCLE_JOBS, log=None):
+        self.python = python
+        self.size = max(1, size)
+        self.recycle_jobs = max(1, recycle_jobs)
+        self.log = log or (lambda message: None)
+        self._idle = []
+        self._busy = set()
+        self._started = 0
+        self._closed = False
+        self._cond = threading.Condition()
+
+    def prewarm(self, count=None):
+        with self._cond:
+            while self._started < min(self.size, count or self.size):
+                self._idle.append(self._spawn())
+
+    def _spawn(self):
+        self._started += 1
+        return PoolWorker(self.python, self.recycle_jobs)
+
+    def acquire(self):
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise RuntimeError("打包进程池已关闭")
+                while self._idle:
+                    worker = self._idle.pop()
+                    if worker.alive():
+                        return worker
+                    self._started -= 1
+                if self._started < self.size:
+                    return self._spawn()
+                self._cond.wait()
+
+    def release(self, worker):
+        with self._cond:
+            if worker.jobs >= worker.max_jobs or not worker.alive() or self._closed:
+                self._started -= 1
+                threading.Thread(target=worker.close, daemon=True).start()
+                if not self._closed and worker.jobs >= worker.max_jobs:
+                    self.log(f"打包进程已完成 {worker.jobs} 个任务，回收并重新启动")
+            else:
+                self._idle.append(worker)
+            self._cond.notify()
+
+    def run(self, args, on_line, env=None, levels=None):
+        worker = self.acquire()
+        with self._cond:
+            self._busy.add(worker)
+        try:
+            return worker.run(args, on_line, env, levels)
+        except BaseException:
+            worker.kill()
+            raise
+        finally:
+            with self._cond:
+                self._busy.discard(worker)
+            self.release(worker)
+
+    def cancel(self):
+        # Killed workers end their build with an error and are replaced on the next acquire.
+        with self._cond:
+            busy = list(self._busy)
+        for worker in busy:
+            worker.kill()
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._cond.notify_all()
+        for worker in idle:
+            worker.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--worker", action="store_true")
+    parser.add_argument("--max-jobs", type=int, default=DEFAULT_RECYCLE_JOBS)
+    args = parser.parse_args()
+    if args.worker:
+        worker_main(args.max_jobs)
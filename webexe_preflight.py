@@ -0,0 +1,354 @@
+import os, io, ssl, sys, json, struct, socket, hashlib, asyncio
+import time
+import argparse
+import urllib.request
+import urllib.error
+from urllib.parse import urljoin, urlsplit, quote
+from html.parser import HTMLParser
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+DEFAULT_TIMEOUT = 8
+DEFAULT_CONCURRENCY = 16
+MAX_REDIRECTS = 5
+MAX_BODY_BYTES = 512 * 1024
+MAX_ICON_BYTES = 1024 * 1024
+ICON_CACHE_DAYS = 30
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) Web2EXE-Preflight/1.0"
+
+REDIRECT_CODES = (301, 302, 303, 307, 308)
+# Login walls still mean the site is up; the packaged app will show the sign-in page.
+ACCEPTED_ERROR_CODES = (401, 403)
+ICO_MAGIC = b"\x00\x00\x01\x00"
+PNG_MAGIC = b"\x89PNG\r\n\x1a\n"
+
+
+class PreflightError(Exception):
+    pass
+
+
+class PreflightResult:
+    def __init__(self, url):
+        self.url = url
+        self.final_url = ""
+        self.status = None
+        self.ok = False
+        # Only a definite answer (an HTTP error, a redirect loop) is fatal; a timeout or connection error may be
+        # local to this machine or network, so the job is still built.
+        self.fatal = False
+        self.error = ""
+        self.icon = ""
+        self.elapsed = 0.0
+
+    def to_dict(self):
+        return {"url": self.url, "final_url": self.final_url, "status": self.status, "ok": self.ok,
+                "fatal": self.fatal, "error": self.error, "icon": self.icon, "elapsed": round(self.elapsed, 3)}
+
+
+class _IconLinkParser(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.icons = []
+        self.touch_icons = []
+
+    def handle_starttag(self, tag, attrs):
+        attrs = {k: v for k, v in attrs if v}
+        if tag != "link" or "href" not in attrs:
+            return
+        rel = attrs.get("rel", "").lower().split()
+        if "icon" in rel:
+            self.icons.append(attrs["href"])
+        elif "apple-touch-icon" in rel or "apple-touch-icon-precomposed" in rel:
+            self.touch_icons.append(attrs["href"])
+
+
+def icon_candidates(page_url, html):
+    parser = _IconLinkParser()
+    try:
+        parser.feed(html)
+    except Exception:
+        pass
+    candidates = []
+    for href in parser.icons + parser.touch_icons + ["/favicon.ico"]:
+        url = urljoin(page_url, href)
+        if urlsplit(url).scheme in ("http", "https") and url not in candidates:
+            candidates.append(url)
+    return candidates
+
+
+def png_to_ico(png):
+    width, height = struct.unpack(">II", png[16:24])
+    if width > 256 or height > 256:
+        return None
+    # Windows Vista and later read PNG data stored directly in an ICO container.
+    header = struct.pack("<HHH", 0, 1, 1)
+    entry = struct.pack("<BBBBHHII", width % 256, height % 256, 0, 0, 1, 32, len(png), 6 + 16)
+    return header + entry + png
+
+
+def to_ico(data):
+    if data.startswith(ICO_MAGIC):
+        return data
+    if data.startswith(PNG_MAGIC) and len(data) > 24:
+        ico = png_to_ico(data)
+        if ico:
+            return ico
+    if Image is None:
+        return None
+    try:
+        image = Image.open(io.BytesIO(data))
+        image.load()
+        size = min(256, max(image.size))
+        output = io.BytesIO()
+        image.convert("RGBA").save(output, format="ICO", sizes=[(size, size)])
+        return output.getvalue()
+    except Exception:
+        return None
+
+
+class IconCache:
+    def __init__(self, cache_dir, max_age_days=ICON_CACHE_DAYS):
+        self.cache_dir = cache_dir
+        self.max_age = max_age_days * 86400
+
+    def path(self, url):
+        parts = urlsplit(url)
+        origin = f"{parts.scheme}://{parts.netloc}".lower()
+        return os.path.join(self.cache_dir, hashlib.sha256(origin.encode("utf-8")).hexdigest()[:16] + ".ico")
+
+    def get(self, url):
+        path = self.path(url)
+        try:
+            if time.time() - os.path.getmtime(path) < self.max_age:
+                return path
+        except OSError:
+            pass
+        return None
+
+    def put(self, url, data):
+        path = self.path(url)
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        return path
+
+
+def _ssl_context():
+    return ssl.create_default_context()
+
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        return None
+
+
+def uses_proxy(parts):
+    proxies = urllib.request.getproxies()
+    return parts.scheme in proxies and not urllib.request.proxy_bypass(parts.hostname)
+
+
+def _proxy_get(url, timeout, max_bytes):
+    # Behind a proxy, urllib does the request (it knows the system/environment proxy settings and CONNECT);
+    # redirects are returned as-is so resolve() sees each hop the same way as without a proxy.
+    request = urllib.request.Request(url, headers={"User-Agent": USER_AGENT, "Accept": "*/*"})
+    try:
+        response = urllib.request.build_opener(_NoRedirect).open(request, timeout=timeout)
+    except urllib.error.HTTPError as e:
+        response = e
+    with response:
+        headers = {name.lower(): value for name, value in response.headers.items()}
+        return response.code, headers, response.read(max_bytes)
+
+
+async def http_get(url, timeout=DEFAULT_TIMEOUT, max_bytes=MAX_BODY_BYTES):
+    parts = urlsplit(url)
+    if parts.scheme not in ("http", "https") or not parts.hostname:
+        raise PreflightError("网址必须以 http:// 或 https:// 开头")
+    if uses_proxy(parts):
+        loop = asyncio.get_running_loop()
+        return await asyncio.wait_for(loop.run_in_executor(None, _proxy_get, url, timeout, max_bytes), timeout)
+    port = parts.port or (443 if parts.scheme == "https" else 80)
+    target = quote((parts.path or "/") + ("?" + parts.query if parts.query else ""), safe="/%?=&:;@!$'()*+,~-._")
+
+    async def exchange():
+        reader, writer = await asyncio.open_connection(
+            parts.hostname, port, ssl=_ssl_context() if parts.scheme == "https" else None)
+        try:
+            # HTTP/1.0 keeps the response unchunked and the connection closes after the body.
+            request = (f"GET {target} HTTP/1.0\r\nHost: {parts.netloc.rsplit('@', 1)[-1]}\r\n"
+                       f"User-Agent: {USER_AGENT}\r\nAccept: */*\r\nAccept-Encoding: identity\r\n"
+                       f"Connection: close\r\n\r\n")
+            writer.write(request.encode("latin-1"))
+            await writer.drain()
+            status_line = (await reader.readline()).decode("latin-1").split(None, 2)
+            if len(status_line) < 2 or not status_line[0].startswith("HTTP/") or not status_line[1].isdigit():
+                raise PreflightError("服务器返回的不是 HTTP 响应")
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                name, _, value = line.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+            status = int(status_line[1])
+            # Stop at Content-Length: some servers keep the socket open despite "Connection: close".
+            limit = max_bytes
+            if status in (204, 304) or status < 200:
+                limit = 0
+            elif headers.get("content-length", "").isdigit():
+                limit = min(limit, int(headers["content-length"]))
+            body = b""
+            while len(body) < limit:
+                chunk = await reader.read(min(65536, limit - len(body)))
+                if not chunk:
+                    break
+                body += chunk
+            return status, headers, body
+        finally:
+            writer.close()
+
+    return await asyncio.wait_for(exchange(), timeout)
+
+
+async def resolve(url, timeout=DEFAULT_TIMEOUT, max_bytes=MAX_BODY_BYTES):
+    current = url
+    for _ in range(MAX_REDIRECTS + 1):
+        status, headers, body = await http_get(current, timeout, max_bytes)
+        if status in REDIRECT_CODES and headers.get("location"):
+            current = urljoin(current, headers["location"])
+            continue
+        return current, status, headers, body
+    raise PreflightError(f"重定向超过 {MAX_REDIRECTS} 次")
+
+
+def describe_error(error, timeout):
+    if isinstance(error, urllib.error.URLError) and isinstance(error.reason, Exception):
+        error = error.reason
+    if isinstance(error, (asyncio.TimeoutError, socket.timeout)):
+        return f"连接超时（{timeout}s）"
+    if isinstance(error, socket.gaierror):
+        return "无法解析域名"
+    if isinstance(error, ConnectionRefusedError):
+        return "连接被拒绝"
+    if isinstance(error, ssl.SSLCertVerificationError):
+        return f"证书无效: {error.verify_message}"
+    if isinstance(error, (PreflightError, ssl.SSLError, OSError)):
+        return str(error) or type(error).__name__
+    return f"{type(error).__name__}: {error}"
+
+
+def is_fatal(error):
+    # A mistyped host or a dead server is rejected; timeouts and proxy failures (wrapped in URLError) may pass.
+    return isinstance(error, (PreflightError, socket.gaierror, ConnectionRefusedError))
+
+
+async def fetch_icon(page_url, html, timeout=DEFAULT_TIMEOUT):
+    for candidate in icon_candidates(page_url, html):
+        try:
+            _, status, _, data = await resolve(candidate, timeout, MAX_ICON_BYTES)
+        except Exception:
+            continue
+        if status == 200:
+            ico = to_ico(data)
+            if ico:
+                return ico
+    return None
+
+
+async def check_url(url, timeout=DEFAULT_TIMEOUT):
+    result = PreflightResult(url)
+    html = ""
+    started = time.time()
+    try:
+        result.final_url, result.status, headers, body = await resolve(url, timeout)
+        if result.status >= 400 and result.status not in ACCEPTED_ERROR_CODES:
+            raise PreflightError(f"HTTP {result.status}")
+        result.ok = True
+        if "html" in headers.get("content-type", ""):
+            html = body.decode("utf-8", errors="replace")
+    except Exception as e:
+        result.error = describe_error(e, timeout)
+        result.fatal = is_fatal(e)
+    result.elapsed = time.time() - started
+    return result, html
+
+
+async def preflight_async(urls, timeout=DEFAULT_TIMEOUT, icon_urls=(), icon_cache=None,
+                          concurrency=DEFAULT_CONCURRENCY):
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def bounded(coro):
+        async with semaphore:
+            return await coro
+
+    checked = await asyncio.gather(*(bounded(check_url(url, timeout)) for url in urls))
+    results = {result.url: result for result, _ in checked}
+    pages = {result.url: html for result, html in checked}
+    if icon_cache is None:
+        return results
+
+    # Icons are cached per origin, so each origin is fetched once from the first page that loaded.
+    wanted = {}
+    for url in icon_urls:
+        if url in results and results[url].ok:
+            wanted.setdefault(icon_cache.path(url), []).append(results[url])
+    missing = [(path, group[0]) for path, group in wanted.items() if not icon_cache.get(group[0].url)]
+
+    async def icon_for(result):
+        return await fetch_icon(result.final_url, pages[result.url], timeout)
+
+    fetched = await asyncio.gather(*(bounded(icon_for(result)) for _, result in missing))
+    for (_, result), ico in zip(missing, fetched):
+        if ico:
+            icon_cache.put(result.url, ico)
+    for group in wanted.values():
+        icon = icon_cache.get(group[0].url) or ""
+        for result in group:
+            result.icon = icon
+    return results
+
+
+def run_preflight(urls, timeout=DEFAULT_TIMEOUT, icon_urls=(), icon_cache=None, concurrency=DEFAULT_CONCURRENCY):
+    urls = list(dict.fromkeys(urls))
+    if not urls:
+        return {}
+    return asyncio.run(preflight_async(urls, timeout, icon_urls, icon_cache, concurrency))
+
+
+def format_result(result):
+    if not result.ok:
+        return f"{'✗' if result.fatal else '⚠'} {result.url}：{result.error}"
+    line = f"✓ {result.url}（HTTP {result.status}，{result.elapsed:.1f}s）"
+    if result.final_url != result.url:
+        line += f" → {result.final_url}"
+    if result.icon:
+        line += f"，图标 {result.icon}"
+    return line
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="并发检查网址是否可访问，并获取网站图标")
+    parser.add_argument("urls", nargs="+")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT)
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY)
+    parser.add_argument("--icons", help="获取网站图标并缓存到此目录")
+    parser.add_argument("--json", action="store_true", help="以 JSON 输出结果")
+    args = parser.parse_args(argv)
+
+    icon_cache = IconCache(args.icons) if args.icons else None
+    results = run_preflight(args.urls, args.timeout, args.urls if icon_cache else (), icon_cache, args.concurrency)
+    if args.json:
+        print(json.dumps([r.to_dict() for r in results.values()], ensure_ascii=False, indent=2))
+    else:
+        for result in results.values():
+            print(format_result(result))
+    return 0 if all(r.ok for r in results.values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
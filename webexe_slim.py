@@ -0,0 +1,230 @@
+import os, sys, ast, json, platform, subprocess
+import importlib.util
+
+# STDLIB_EXCLUDES is a curated list of modules a launcher never needs at runtime. Many of them are still reachable
+# through lazy imports inside functions (shutil -> tarfile, for instance), which is why the list is not derived
+# from a full import graph. Instead, each launcher's import-time closure is resolved under the Python that runs
+# PyInstaller (see import_closure), and anything in it is kept, so a module that pywebview or a backend imports
+# while loading is never excluded.
+
+STDLIB_EXCLUDES = [
+    "unittest", "doctest", "pdb", "pydoc", "pydoc_data", "lib2to3", "idlelib", "turtle", "turtledemo",
+    "test", "ensurepip", "venv", "distutils", "setuptools", "pkg_resources", "xmlrpc", "sqlite3",
+    "curses", "tkinter.test", "decimal", "_decimal", "_pydecimal", "tarfile", "lzma", "_lzma", "bz2", "_bz2",
+    "pickletools", "ftplib", "imaplib", "poplib", "smtplib", "mailbox", "telnetlib",
+]
+
+TK_MODULES = ["tkinter", "_tkinter"]
+
+WEBVIEW_BACKENDS = {
+    "Windows": ["webview.platforms.winforms", "webview.platforms.edgechromium", "webview.platforms.mshtml",
+                "clr", "clr_loader", "pythonnet"],
+    "Darwin": ["webview.platforms.cocoa", "objc", "AppKit", "Foundation", "WebKit"],
+    "Linux": ["webview.platforms.gtk", "webview.platforms.qt", "gi", "qtpy",
+              "PyQt5", "PyQt6", "PySide2", "PySide6"],
+}
+UNUSED_WEBVIEW_BACKENDS = ["webview.platforms.cef", "cefpython3", "webview.platforms.android", "android", "jnius"]
+
+
+def script_imports(source):
+    names = set()
+    for node in ast.walk(ast.parse(source)):
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                parts = alias.name.split(".")
+                names.update(".".join(parts[:i]) for i in range(1, len(parts) + 1))
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            parts = node.module.split(".")
+            names.update(".".join(parts[:i]) for i in range(1, len(parts) + 1))
+    return names
+
+
+def _catches_import_error(handler):
+    types = handler.type.elts if isinstance(handler.type, ast.Tuple) else [handler.type]
+    return handler.type is None or any(isinstance(t, ast.Name) and t.id in ("ImportError", "ModuleNotFoundError", "Exception")
+                                       for t in types)
+
+
+def _eager_imports(tree, package):
+    # Imports that run when the module loads: module and class bodies, including if/try blocks, not functions.
+    names = set()
+    stack = list(tree.body)
+    while stack:
+        node = stack.pop()
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.Lambda)):
+            continue
+        if isinstance(node, ast.Try) and any(_catches_import_error(handler) for handler in node.handlers):
+            # "try: import bz2 / except ImportError" works without the module, so excluding it stays safe.
+            stack.extend(node.handlers + node.orelse + node.finalbody)
+            continue
+        if isinstance(node, ast.Import):
+            names.update(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            module = node.module or ""
+            if node.level:
+                base = package.split(".")[:len(package.split(".")) - node.level + 1] if package else []
+                module = ".".join(base + ([module] if module else []))
+            if module:
+                names.add(module)
+                names.update(f"{module}.{alias.name}" for alias in node.names if alias.name != "*")
+        stack.extend(ast.iter_child_nodes(node))
+    return names
+
+
+def import_closure(source):
+    closure = set()
+    queue = list(_eager_imports(ast.parse(source), ""))
+    while queue:
+        name = queue.pop()
+        if name in closure:
+            continue
+        try:
+            spec = importlib.util.find_spec(name)
+        except Exception:
+            spec = None
+        if spec is None:
+            continue
+        closure.add(name)
+        parts = name.split(".")
+        queue += [".".join(parts[:i]) for i in range(1, len(parts))]
+        if spec.origin and spec.origin.endswith(".py"):
+            package = name if spec.submodule_search_locations else name.rpartition(".")[0]
+            try:
+                with open(spec.origin, "rb") as f:
+                    queue += _eager_imports(ast.parse(f.read()), package)
+            except (OSError, SyntaxError, ValueError):
+                pass
+    return closure
+
+
+def run_import_closure(source, python=None):
+    # Runs import_closure under the given interpreter, since the launcher is analysed by that Python's stdlib and
+    # site-packages rather than ours. Returns None if it cannot be computed.
+    try:
+        output = subprocess.run([python or sys.executable, os.path.abspath(__file__), "--closure"], input=source,
+                                capture_output=True, text=True, encoding="utf-8", timeout=120)
+        if output.returncode != 0:
+            return None
+        return set(json.loads(output.stdout))
+    except (OSError, ValueError, subprocess.SubprocessError):
+        return None
+
+
+def slim_excludes(source, system=None, closure=None):
+    system = system or platform.system()
+    imports = script_imports(source)
+    needed = imports | (closure or set())
+    excludes = [m for m in STDLIB_EXCLUDES if m not in needed]
+    if "tkinter" not in needed:
+        excludes += TK_MODULES
+    if "webview" in imports:
+        for backend_system, modules in WEBVIEW_BACKENDS.items():
+            if backend_system != system:
+                excludes += modules
+        excludes += UNUSED_WEBVIEW_BACKENDS
+    else:
+        excludes += ["webview"] + UNUSED_WEBVIEW_BACKENDS
+        for modules in WEBVIEW_BACKENDS.values():
+            excludes += modules
+    keep = set(needed)
+    if "webview" in imports:
+        keep.update(WEBVIEW_BACKENDS.get(system, []))
+    return sorted(m for m in set(excludes) if m not in keep)
+
+
+def exclude_args(excludes):
+    args = []
+    for module in excludes:
+        args += ["--exclude-module", module]
+    return args
+
+
+def _read_toc(path):
+    with open(path, encoding="utf-8") as f:
+        return ast.literal_eval(f.read())
+
+
+def _entry_size(path):
+    try:
+        return os.path.getsize(path)
+    except (OSError, TypeError):
+        return 0
+
+
+def bundle_report(workpath, artifact=None):
+    packages = {}
+    binaries = []
+    data_files = 0
+    module_count = 0
+
+    pyz_toc = os.path.join(workpath, "PYZ-00.toc")
+    if os.path.exists(pyz_toc):
+        for name, path, typecode in _read_toc(pyz_toc)[1]:
+            module_count += 1
+            top = name.split(".")[0]
+            packages[top] = packages.get(top, 0) + _entry_size(path)
+
+    pkg_toc = os.path.join(workpath, "PKG-00.toc")
+    if os.path.exists(pkg_toc):
+        for name, path, typecode in _read_toc(pkg_toc)[2]:
+            if typecode in ("BINARY", "EXTENSION"):
+                binaries.append((name, _entry_size(path)))
+            elif typecode == "DATA":
+                data_files += _entry_size(path)
+
+    binaries.sort(key=lambda item: item[1], reverse=True)
+    return {
+        "modules": module_count,
+        "module_bytes": sum(packages.values()),
+        "packages": dict(sorted(packages.items(), key=lambda item: item[1], reverse=True)),
+        "binaries": binaries,
+        "binary_bytes": sum(size for _, size in binaries),
+        "data_bytes": data_files,
+        "artifact_bytes": _artifact_size(artifact) if artifact else None,
+    }
+
+
+def _artifact_size(path):
+    if not os.path.isdir(path):
+        return _entry_size(path)
+    return sum(_entry_size(os.path.join(dirpath, f)) for dirpath, _, files in os.walk(path) for f in files)
+
+
+def _mb(size):
+    return f"{size / (1024 * 1024):.2f} MB"
+
+
+def format_report(report, previous=None, top=8):
+    lines = [
+        f"模块 {report['modules']} 个 ({_mb(report['module_bytes'])} 源码)，"
+        f"二进制 {len(report['binaries'])} 个 ({_mb(report['binary_bytes'])})，数据 {_mb(report['data_bytes'])}"
+    ]
+    if report["artifact_bytes"] is not None:
+        line = f"输出大小 {_mb(report['artifact_bytes'])}"
+        if previous and previous.get("artifact_bytes"):
+            delta = report["artifact_bytes"] - previous["artifact_bytes"]
+            line += f"（较上次 {'+' if delta >= 0 else '-'}{_mb(abs(delta))}）"
+        lines.append(line)
+    lines.append("最大的包: " + ", ".join(f"{name} {_mb(size)}" for name, size in list(report["packages"].items())[:top]))
+    lines.append("最大的二进制: " + ", ".join(f"{name} {_mb(size)}" for name, size in report["binaries"][:top]))
+    return lines
+
+
+def save_report(report, path, history_path=None):
+    previous = None
+    if history_path and os.path.exists(history_path):
+        try:
+            with open(history_path, encoding="utf-8") as f:
+                previous = json.load(f)
+        except (OSError, ValueError):
+            previous = None
+    for target in filter(None, (path, history_path)):
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        with open(target, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    return previous
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] == ["--closure"]:
+        print(json.dumps(sorted(import_closure(sys.stdin.read()))))
@@ -0,0 +1,246 @@
+import re, json, hashlib, zipfile, threading
+import time
+import urllib.request
+import urllib.error
+from urllib.parse import urljoin, urlsplit, urldefrag
+from html.parser import HTMLParser
+from concurrent.futures import ThreadPoolExecutor
+
+SNAPSHOT_FILENAME = "web2exe_snapshot.zip"
+SNAPSHOT_SCOPES = ("path", "host")
+DEFAULT_SNAPSHOT_DEPTH = 1
+DEFAULT_MAX_PAGES = 200
+DEFAULT_MAX_MB = 200
+FETCH_TIMEOUT = 15
+FETCH_WORKERS = 8
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) Web2EXE-Snapshot/1.0"
+
+CSS_URL = re.compile(r"""url\(\s*['"]?([^'")]+)['"]?\s*\)|@import\s+['"]([^'"]+)['"]""")
+REWRITE_TYPES = ("html", "css", "javascript", "json")
+STORED_TYPES = ("image/", "font/", "video/", "audio/", "application/zip", "application/font-woff")
+ASSET_ATTRS = {
+    "script": ("src",), "img": ("src", "srcset"), "source": ("src", "srcset"), "video": ("src", "poster"),
+    "audio": ("src",), "track": ("src",), "embed": ("src",), "input": ("src",), "object": ("data",),
+}
+PAGE_TAGS = {"a": "href", "area": "href", "iframe": "src", "frame": "src"}
+
+
+def snapshot_port(url):
+    # A stable port per site keeps the local origin (and so cookies/localStorage) the same across launches.
+    return 20000 + int(hashlib.sha1(url.encode("utf-8")).hexdigest(), 16) % 20000
+
+
+class _LinkParser(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.pages = []
+        self.assets = []
+        self.styles = []
+        self.base = None
+        self._in_style = False
+
+    def handle_starttag(self, tag, attrs):
+        attrs = {k: v for k, v in attrs if v}
+        if tag == "base" and "href" in attrs and self.base is None:
+            self.base = attrs["href"]
+        if tag in PAGE_TAGS and PAGE_TAGS[tag] in attrs:
+            self.pages.append(attrs[PAGE_TAGS[tag]])
+        if tag == "link" and "href" in attrs:
+            rel = attrs.get("rel", "").lower()
+            if "alternate" not in rel and "canonical" not in rel:
+                self.assets.append(attrs["href"])
+        for attr in ASSET_ATTRS.get(tag, ()):
+            if attr not in attrs:
+                continue
+            if attr == "srcset":
+                self.assets += [item.strip().split(" ")[0] for item in attrs[attr].split(",") if item.strip()]
+            else:
+                self.assets.append(attrs[attr])
+        if "style" in attrs:
+            self.styles.append(attrs["style"])
+        self._in_style = tag == "style"
+
+    def handle_endtag(self, tag):
+        if tag == "style":
+            self._in_style = False
+
+    def handle_data(self, data):
+        if self._in_style:
+            self.styles.append(data)
+
+
+def css_links(text):
+    return [a or b for a, b in CSS_URL.findall(text) if not (a or b).startswith("data:")]
+
+
+def html_references(text):
+    parser = _LinkParser()
+    try:
+        parser.feed(text)
+    except Exception:
+        pass
+    assets = list(parser.assets)
+    for style in parser.styles:
+        assets += css_links(style)
+    return parser.base, parser.pages, assets
+
+
+def _decode(body, content_type):
+    charset = "utf-8"
+    if "charset=" in content_type:
+        charset = content_type.split("charset=")[-1].split(";")[0].strip() or charset
+    try:
+        return body.decode(charset, errors="replace")
+    except LookupError:
+        return body.decode("utf-8", errors="replace")
+
+
+def rewrite_origin(body, origin, content_type):
+    # Absolute same-origin links would bypass the local server, so make them root-relative.
+    if not any(kind in content_type for kind in REWRITE_TYPES):
+        return body
+    netloc = origin.split("://", 1)[1]
+    pattern = re.compile(rb"(?:https?:)?//" + re.escape(netloc.encode("utf-8")) + rb"(?=[/\"'?#\s)]|$)")
+    return pattern.sub(lambda match: b"" if body[match.end():match.end() + 1] == b"/" else b"/", body)
+
+
+def _request_key(url):
+    parts = urlsplit(url)
+    return (parts.path or "/") + ("?" + parts.query if parts.query else "")
+
+
+class SiteCrawler:
+    def __init__(self, start_url, depth=DEFAULT_SNAPSHOT_DEPTH, scope="host", max_pages=DEFAULT_MAX_PAGES,
+                 max_mb=DEFAULT_MAX_MB, log=None):
+        if scope not in SNAPSHOT_SCOPES:
+            raise ValueError(f"未知的快照范围: {scope}")
+        self.start_url = urldefrag(start_url)[0]
+        self.requested_url = self.start_url
+        self._set_start(self.start_url)
+        self.depth = max(0, depth)
+        self.scope = scope
+        self.max_pages = max_pages
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.log = log or (lambda message: None)
+        self.files = {}
+        self.total_bytes = 0
+        self.pages = 0
+        self.failed = 0
+        self._seen = set()
+        self._lock = threading.Lock()
+
+    def _set_start(self, url):
+        start = urlsplit(url)
+        self.start_url = url
+        self.origin = (start.scheme, start.netloc)
+        self.path_prefix = start.path.rsplit("/", 1)[0] + "/"
+
+    def same_origin(self, url):
+        parts = urlsplit(url)
+        return (parts.scheme, parts.netloc) == self.origin
+
+    def page_in_scope(self, url):
+        if not self.same_origin(url):
+            return False
+        return self.scope == "host" or (urlsplit(url).path or "/").startswith(self.path_prefix)
+
+    def fetch(self, url, start=False):
+        request = urllib.request.Request(url, headers={"User-Agent": USER_AGENT})
+        try:
+            with urllib.request.urlopen(request, timeout=FETCH_TIMEOUT) as response:
+                final_url = urldefrag(response.geturl())[0]
+                if start and final_url != self.start_url:
+                    # http -> https or apex -> www: the site lives where the start page ended up.
+                    self.log(f"快照：起始页面重定向到 {final_url}")
+                    with self._lock:
+                        self._set_start(final_url)
+                        self._seen.add(final_url)
+                elif not self.same_origin(final_url):
+                    return None
+                body = response.read()
+                content_type = response.headers.get("Content-Type") or "application/octet-stream"
+        except (urllib.error.URLError, OSError, ValueError) as e:
+            with self._lock:
+                self.failed += 1
+            self.log(f"快照：无法下载 {url}: {e}")
+            return None
+        with self._lock:
+            if self.total_bytes + len(body) > self.max_bytes:
+                self.log(f"快照：超过大小上限，跳过 {url}")
+                return None
+            self.total_bytes += len(body)
+            self.files[_request_key(url)] = (content_type, body)
+            self.files[_request_key(final_url)] = (content_type, body)
+        return final_url, content_type, body
+
+    def _claim(self, url):
+        url = urldefrag(url)[0]
+        with self._lock:
+            if url in self._seen:
+                return None
+            self._seen.add(url)
+        return url
+
+    def _links(self, url, content_type, body):
+        pages, assets = [], []
+        if "html" in content_type:
+            base, page_links, asset_links = html_references(_decode(body, content_type))
+            base = urljoin(url, base) if base else url
+            pages = [urljoin(base, link) for link in page_links]
+            assets = [urljoin(base, link) for link in asset_links]
+        elif "css" in content_type:
+            assets = [urljoin(url, link) for link in css_links(_decode(body, content_type))]
+        clean = lambda links: [link for link in links if urlsplit(link).scheme in ("http", "https")]
+        return clean(pages), clean(assets)
+
+    def _visit(self, url):
+        fetched = self.fetch(url, url == self.requested_url)
+        if fetched is None:
+            return [], []
+        return self._links(*fetched)
+
+    def crawl(self):
+        started = time.time()
+        level = [self._claim(self.start_url)]
+        with ThreadPoolExecutor(max_workers=FETCH_WORKERS, thread_name_prefix="web2exe-snapshot") as pool:
+            for depth in range(self.depth + 1):
+                next_level, assets = [], []
+                self.pages += len(level)
+                for pages, found_assets in pool.map(self._visit, level):
+                    assets += found_assets
+                    if depth < self.depth:
+                        next_level += pages
+                # Assets are always collected; CSS can reference further assets (fonts, images, @import).
+                while assets:
+                    batch = [u for u in (self._claim(a) for a in assets if self.same_origin(a)) if u]
+                    assets = []
+                    for _, found_assets in pool.map(self._visit, batch):
+                        assets += found_assets
+                level = [u for u in (self._claim(p) for p in next_level if self.page_in_scope(p)) if u]
+                level = level[:max(0, self.max_pages - self.pages)]
+                if not level:
+                    break
+        self.log(f"快照完成：{self.pages} 个页面，{len(self.files)} 个文件，"
+                 f"{self.total_bytes / (1024 * 1024):.1f} MB，失败 {self.failed}，用时 {time.time() - started:.1f}s")
+        return self.files
+
+    def write_archive(self, path):
+        start_key = _request_key(self.start_url)
+        if start_key not in self.files:
+            raise RuntimeError(f"快照失败：无法下载起始页面 {self.start_url}")
+        index = {"start": start_key, "origin": "%s://%s" % self.origin, "files": {}}
+        with zipfile.ZipFile(path, "w") as archive:
+            for n, (key, (content_type, body)) in enumerate(sorted(self.files.items())):
+                name = f"files/{n}"
+                stored = content_type.startswith(STORED_TYPES)
+                body = rewrite_origin(body, index["origin"], content_type)
+                archive.writestr(name, body, zipfile.ZIP_STORED if stored else zipfile.ZIP_DEFLATED)
+                index["files"][key] = {"file": name, "type": content_type}
+            archive.writestr("index.json", json.dumps(index, ensure_ascii=False), zipfile.ZIP_DEFLATED)
+        return path
+
+
+def build_snapshot(url, path, depth=DEFAULT_SNAPSHOT_DEPTH, scope="host", log=None):
+    crawler = SiteCrawler(url, depth, scope, log=log)
+    crawler.crawl()
+    return crawler.write_archive(path)
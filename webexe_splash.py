@@ -0,0 +1,200 @@
+import os, re, base64, shutil, hashlib, mimetypes, tempfile
+from urllib.parse import urlsplit, unquote
+
+from webexe_snapshot import html_references, css_links
+
+SPLASH_BUNDLE_VERSION = 2
+INLINE_LIMIT = 32 * 1024
+EXTERNAL_DIR = "_external"
+
+LINK_TAG = re.compile(r"<link\b[^>]*>", re.I)
+SCRIPT_TAG = re.compile(r"<script\b([^>]*)\bsrc\s*=\s*([\"'])(.*?)\2([^>]*)>\s*</script>", re.I | re.S)
+ATTR = re.compile(r"""\b(rel|href)\s*=\s*(["'])(.*?)\2""", re.I | re.S)
+HTML_COMMENT = re.compile(r"<!--(?!\[if).*?-->", re.S)
+CSS_COMMENT = re.compile(r"/\*.*?\*/", re.S)
+
+
+def local_reference(ref):
+    ref = (ref or "").strip()
+    if not ref or ref.startswith(("#", "//")):
+        return None
+    parts = urlsplit(ref)
+    if parts.scheme or parts.netloc or not parts.path:
+        return None
+    return unquote(parts.path)
+
+
+def _read_text(path):
+    with open(path, "rb") as f:
+        return f.read().decode("utf-8", errors="replace")
+
+
+def resolve_assets(html_path, log=None):
+    html_path = os.path.abspath(html_path)
+    refs = {}
+    found = []
+    queue = [html_path]
+    while queue:
+        owner = queue.pop(0)
+        text = _read_text(owner)
+        links = html_references(text)[2] if owner == html_path else css_links(text)
+        for ref in links:
+            path = local_reference(ref)
+            if not path:
+                continue
+            target = os.path.normpath(os.path.join(os.path.dirname(owner), path))
+            if not os.path.isfile(target):
+                if log:
+                    log(f"警告：启动页引用的文件不存在: {ref}")
+                continue
+            refs[(owner, ref)] = target
+            if target not in found and target != html_path:
+                found.append(target)
+                if target.lower().endswith(".css"):
+                    queue.append(target)
+    return refs, found
+
+
+def bundle_key(html_path, assets, inline):
+    digest = hashlib.sha256()
+    digest.update(f"{SPLASH_BUNDLE_VERSION}:{inline}:{INLINE_LIMIT}".encode())
+    root = os.path.dirname(os.path.abspath(html_path))
+    for path in [os.path.abspath(html_path)] + sorted(assets):
+        digest.update(os.path.relpath(path, root).replace(os.sep, "/").encode("utf-8") + b"\0")
+        with open(path, "rb") as f:
+            digest.update(hashlib.sha256(f.read()).digest())
+    return digest.hexdigest()[:24]
+
+
+def minify_css(text):
+    text = CSS_COMMENT.sub("", text)
+    text = re.sub(r"\s+", " ", text)
+    # A space before ":" separates a descendant selector ("a :hover"), so only the space after it goes.
+    text = re.sub(r"\s*([{};,>])\s*", r"\1", text)
+    return re.sub(r":\s+", ":", text).replace(";}", "}").strip()
+
+
+def minify_html(text):
+    text = HTML_COMMENT.sub("", text)
+    return "\n".join(line.strip() for line in text.splitlines() if line.strip())
+
+
+def replace_reference(text, ref, new_ref):
+    pattern = re.compile(r"""(["'(]\s*)""" + re.escape(ref) + r"""(\s*["')])""")
+    return pattern.sub(lambda match: match.group(1) + new_ref + match.group(2), text)
+
+
+def data_uri(path, data=None):
+    mime = mimetypes.guess_type(path)[0] or "application/octet-stream"
+    if data is None:
+        with open(path, "rb") as f:
+            data = f.read()
+    return f"data:{mime};base64,{base64.b64encode(data).decode('ascii')}"
+
+
+class SplashBundler:
+    def __init__(self, html_path, inline=False, log=None):
+        self.html_path = os.path.abspath(html_path)
+        self.root = os.path.dirname(self.html_path)
+        self.inline = inline
+        self.log = log or (lambda message: None)
+        self.refs, self.assets = resolve_assets(self.html_path, log)
+        self.inlined = {path for path in self.assets if inline and os.path.getsize(path) <= INLINE_LIMIT}
+        self._css = {}
+
+    def staged_name(self, path):
+        if path == self.html_path:
+            return os.path.basename(path)
+        rel = os.path.relpath(path, self.root)
+        if rel.startswith(".."):
+            digest = hashlib.sha256(path.encode("utf-8")).hexdigest()[:8]
+            return f"{EXTERNAL_DIR}/{digest}_{os.path.basename(path)}"
+        return rel.replace(os.sep, "/")
+
+    def link_to(self, owner, target):
+        if target in self.inlined:
+            data = self.css_text(target).encode("utf-8") if target.lower().endswith(".css") else None
+            return data_uri(target, data)
+        owner_dir = os.path.dirname(self.staged_name(owner))
+        return os.path.relpath(self.staged_name(target), owner_dir or ".").replace(os.sep, "/")
+
+    def rewrite(self, owner, text, relative_to=None):
+        for (ref_owner, ref), target in self.refs.items():
+            if ref_owner != owner:
+                continue
+            new_ref = self.link_to(relative_to or owner, target)
+            if local_reference(ref) != new_ref:
+                text = replace_reference(text, ref, new_ref)
+        return text
+
+    def css_text(self, path, relative_to=None):
+        key = (path, relative_to)
+        if key not in self._css:
+            self._css[key] = ""
+            text = self.rewrite(path, _read_text(path), relative_to)
+            self._css[key] = minify_css(text) if self.inline else text
+        return self._css[key]
+
+    def html_text(self):
+        text = _read_text(self.html_path)
+        if self.inline:
+            text = LINK_TAG.sub(self._inline_link, text)
+            text = SCRIPT_TAG.sub(self._inline_script, text)
+        text = self.rewrite(self.html_path, text)
+        return minify_html(text) if self.inline else text
+
+    def _target(self, ref):
+        return self.refs.get((self.html_path, ref))
+
+    def _inline_link(self, match):
+        attrs = {name.lower(): value for name, _, value in ATTR.findall(match.group(0))}
+        target = self._target(attrs.get("href", ""))
+        if "stylesheet" not in attrs.get("rel", "").lower() or target not in self.inlined:
+            return match.group(0)
+        return f"<style>{self.css_text(target, relative_to=self.html_path)}</style>"
+
+    def _inline_script(self, match):
+        target = self._target(match.group(3))
+        if target not in self.inlined:
+            return match.group(0)
+        script = _read_text(target).strip().replace("</script", "<\\/script")
+        return f"<script{match.group(1)}{match.group(4)}>{script}</script>"
+
+    def write(self, dest_dir):
+        html = self.html_text()
+        with open(os.path.join(dest_dir, os.path.basename(self.html_path)), "w", encoding="utf-8") as f:
+            f.write(html)
+        for path in self.assets:
+            if path in self.inlined:
+                continue
+            target = os.path.join(dest_dir, *self.staged_name(path).split("/"))
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            if path.lower().endswith(".css"):
+                with open(target, "w", encoding="utf-8") as f:
+                    f.write(self.css_text(path))
+            else:
+                shutil.copyfile(path, target)
+
+
+def bundle_splash(html_path, cache_dir, inline=False, log=None):
+    bundler = SplashBundler(html_path, inline, log)
+    key = bundle_key(html_path, bundler.assets, inline)
+    bundle_dir = os.path.join(cache_dir, key)
+    if os.path.isdir(bundle_dir):
+        return bundle_dir
+
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(prefix=key + ".", dir=cache_dir)
+    try:
+        bundler.write(tmp_dir)
+        try:
+            os.replace(tmp_dir, bundle_dir)
+        except OSError:
+            if not os.path.isdir(bundle_dir):
+                raise
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    if log:
+        kept = len(bundler.assets) - len(bundler.inlined)
+        log(f"启动页资源：引用 {len(bundler.assets)} 个文件，内联 {len(bundler.inlined)} 个，单独打包 {kept} 个")
+    return bundle_dir
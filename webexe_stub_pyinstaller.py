@@ -0,0 +1,103 @@
+import os, sys, time
+import argparse
+
+# Stand-in for the pyinstaller executable, used by webexe_bench.py to measure Web2EXE's own overhead.
+# It accepts the arguments BuildEngine passes, prints PyInstaller-style log lines (with the phase markers
+# webexe_metrics looks for) to stderr, spends the configured time in each phase and writes a dummy artifact.
+
+PHASE_LINES = [
+    ("analysis", "INFO: Running Analysis Analysis-00.toc"),
+    ("pyz", "INFO: Building PYZ (ZlibArchive) {workpath}/PYZ-00.pyz"),
+    ("pkg", "INFO: Building PKG (CArchive) {name}.pkg"),
+    ("exe", "INFO: Building EXE from EXE-00.toc"),
+    ("collect", "INFO: Building COLLECT COLLECT-00.toc"),
+]
+DEFAULT_PHASES = "analysis=0.2,pyz=0.05,pkg=0.1,exe=0.02,collect=0.02"
+
+
+def parse_phases(spec):
+    phases = {}
+    for item in filter(None, spec.split(",")):
+        name, _, value = item.partition("=")
+        cpu = value.endswith(":cpu")
+        phases[name] = (float(value[:-4] if cpu else value), cpu)
+    return phases
+
+
+def spend(seconds, cpu):
+    if not cpu:
+        time.sleep(seconds)
+        return
+    deadline = time.perf_counter() + seconds
+    x = 0
+    while time.perf_counter() < deadline:
+        x = (x * 31 + 7) % 1000003
+
+
+def write_artifact(path, size_bytes):
+    block = os.urandom(min(size_bytes, 1024 * 1024)) or b"\0"
+    with open(path, "wb") as f:
+        remaining = size_bytes
+        while remaining > 0:
+            f.write(block[:remaining])
+            remaining -= len(block)
+    os.chmod(path, 0o755)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("script", nargs="?")
+    parser.add_argument("--version", action="store_true")
+    parser.add_argument("--name")
+    parser.add_argument("--distpath", default="dist")
+    parser.add_argument("--workpath", default="build")
+    parser.add_argument("--specpath")
+    parser.add_argument("--onedir", action="store_true")
+    parser.add_argument("--onefile", action="store_true")
+    parser.add_argument("--stub-lines", type=int, default=int(os.environ.get("WEB2EXE_STUB_LINES", "400")))
+    parser.add_argument("--stub-phases", default=os.environ.get("WEB2EXE_STUB_PHASES", DEFAULT_PHASES))
+    parser.add_argument("--stub-size-mb", type=float, default=float(os.environ.get("WEB2EXE_STUB_SIZE_MB", "8")))
+    parser.add_argument("--stub-fail", action="store_true")
+    args, _ = parser.parse_known_args(argv)
+
+    if args.version:
+        print("6.0.0-stub")
+        return 0
+
+    started = time.time()
+    name = args.name or os.path.splitext(os.path.basename(args.script or "app"))[0]
+    workpath = os.path.join(args.workpath, name)
+    os.makedirs(workpath, exist_ok=True)
+    phases = parse_phases(args.stub_phases)
+    active = [(phase, line) for phase, line in PHASE_LINES if phase != "collect" or args.onedir]
+    lines_per_phase = max(1, args.stub_lines // len(active))
+
+    for phase, marker in active:
+        seconds, cpu = phases.get(phase, (0.0, False))
+        stderr = sys.stderr
+        stderr.write(f"{int((time.time() - started) * 1000)} {marker.format(workpath=workpath, name=name)}\n")
+        step = seconds / lines_per_phase
+        for i in range(lines_per_phase):
+            spend(step, cpu)
+            stderr.write(f"{int((time.time() - started) * 1000)} INFO: {phase} step {i} t={time.time():.6f}\n")
+        stderr.flush()
+
+    if args.stub_fail:
+        sys.stderr.write("ERROR: stub failure requested\n")
+        return 1
+
+    os.makedirs(args.distpath, exist_ok=True)
+    suffix = ".exe" if sys.platform == "win32" else ""
+    size_bytes = int(args.stub_size_mb * 1024 * 1024)
+    if args.onedir:
+        target_dir = os.path.join(args.distpath, name)
+        os.makedirs(target_dir, exist_ok=True)
+        write_artifact(os.path.join(target_dir, name + suffix), size_bytes)
+    else:
+        write_artifact(os.path.join(args.distpath, name + suffix), size_bytes)
+    sys.stderr.write(f"{int((time.time() - started) * 1000)} INFO: Build complete! The results are available in: {args.distpath}\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,153 @@
+import os, sys, io, json, hashlib, zipfile, tempfile
+import platform
+
+from webexe_launcher import build_template_launcher_content, build_persistent_stub_content
+from webexe_overlay import PAYLOAD_MAGIC, append_overlay, pack_payload, pkg_offset, copy_file, append_file
+
+TEMPLATE_FORMAT_VERSION = 1
+PERSISTENT_STUB = ("persistent",)
+
+
+def template_variant(job):
+    return (bool(job.use_webview), job.has_splash)
+
+
+def template_name(variant):
+    if variant == PERSISTENT_STUB:
+        return "web2exe-persistent-stub"
+    use_webview, use_splash = variant
+    return "web2exe-template-" + ("webview" if use_webview else "browser") + ("-splash" if use_splash else "")
+
+
+def template_script(variant):
+    if variant == PERSISTENT_STUB:
+        return build_persistent_stub_content(PAYLOAD_MAGIC)
+    use_webview, use_splash = variant
+    return build_template_launcher_content(use_webview, use_splash, PAYLOAD_MAGIC)
+
+
+def template_key(variant, base_cmd, tool_version):
+    digest = hashlib.sha256()
+    digest.update(str(TEMPLATE_FORMAT_VERSION).encode())
+    digest.update(template_script(variant).encode("utf-8"))
+    digest.update(json.dumps([base_cmd, tool_version, sys.version, platform.platform()]).encode("utf-8"))
+    return template_name(variant) + "-" + digest.hexdigest()[:16]
+
+
+def can_patch_resources():
+    if sys.platform != "win32":
+        return False
+    try:
+        from PyInstaller.utils.win32 import icon, versioninfo  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def parse_version(version):
+    parts = []
+    for part in (version or "").replace(",", ".").split("."):
+        digits = "".join(ch for ch in part if ch.isdigit())
+        parts.append(int(digits) if digits else 0)
+    parts = (parts + [0, 0, 0, 0])[:4]
+    return tuple(min(p, 65535) for p in parts)
+
+
+def version_file_content(job):
+    numbers = parse_version(job.version)
+    version_text = job.version or ".".join(str(n) for n in numbers)
+    strings = [
+        ("CompanyName", job.company),
+        ("FileDescription", job.desc or job.title),
+        ("FileVersion", version_text),
+        ("InternalName", job.name),
+        ("OriginalFilename", job.name + ".exe"),
+        ("ProductName", job.title),
+        ("ProductVersion", version_text),
+    ]
+    string_structs = ",\n            ".join(f"StringStruct({k!r}, {v!r})" for k, v in strings)
+    return f"""VSVersionInfo(
+  ffi=FixedFileInfo(filevers={numbers!r}, prodvers={numbers!r}, mask=0x3f, flags=0x0, OS=0x40004,
+                    fileType=0x1, subtype=0x0, date=(0, 0)),
+  kids=[
+    StringFileInfo([
+        StringTable('080404b0', [
+            {string_structs}])
+    ]),
+    VarFileInfo([VarStruct('Translation', [2052, 1200])])
+  ]
+)
+"""
+
+
+def patch_resources(exe_path, icon_path, job):
+    from PyInstaller.utils.win32 import icon, versioninfo
+
+    if icon_path:
+        icon.CopyIcons(exe_path, os.path.abspath(icon_path))
+    if job.version or job.company or job.desc:
+        fd, version_path = tempfile.mkstemp(suffix=".txt", prefix="web2exe_version_")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(version_file_content(job))
+            info = versioninfo.load_version_info_from_text_file(version_path)
+            versioninfo.write_version_info_to_executable(exe_path, info)
+        finally:
+            os.remove(version_path)
+
+
+def splash_archive(splash_dir):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        for dirpath, dirnames, filenames in os.walk(splash_dir):
+            for filename in filenames:
+                full_path = os.path.join(dirpath, filename)
+                archive.write(full_path, os.path.relpath(full_path, splash_dir))
+    return buffer.getvalue()
+
+
+def job_payload(job, splash_dir=None):
+    config = {
+        "url": job.url,
+        "title": job.title,
+        "company": job.company,
+        "winicon": bool(job.winicon_clean),
+    }
+    if job.storage:
+        config["storage"] = job.storage_options()
+    if job.warmup != "off":
+        config["warmup"] = job.warmup
+    blob = b""
+    if job.has_splash:
+        config["splash"] = os.path.basename(job.splash_html)
+        blob = splash_archive(splash_dir or os.path.dirname(os.path.abspath(job.splash_html)))
+    return pack_payload(json.dumps(config, ensure_ascii=False).encode("utf-8"), blob)
+
+
+def stamp_launcher(template_path, dest_path, job, log=None, overlay=(), payload=None):
+    patch = can_patch_resources() and bool(job.icon or job.version or job.company or job.desc)
+    tmp_path = dest_path + ".web2exe-tmp"
+    try:
+        if patch:
+            split = pkg_offset(template_path)
+            copy_file(template_path, tmp_path, limit=split)
+            patch_resources(tmp_path, job.icon, job)
+            if split is not None:
+                append_file(tmp_path, template_path, offset=split)
+            if log:
+                log("已写入图标和版本信息")
+        else:
+            copy_file(template_path, tmp_path)
+
+        if payload is None:
+            payload = [job_payload(job)]
+        append_overlay(tmp_path, list(overlay) + list(payload))
+        if patch:
+            from PyInstaller.utils.win32 import winutils
+            winutils.update_exe_pe_checksum(tmp_path)
+        os.chmod(tmp_path, 0o755)
+        os.replace(tmp_path, dest_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return dest_path
@@ -0,0 +1,281 @@
+import os, sys, json, shutil, tempfile, subprocess
+import time
+import argparse
+import shlex
+import statistics
+
+from webexe_engine import BuildEngine, BuildJob, PACKAGE_MODES
+from webexe_launcher import WARMUP_MODES
+
+FIRST_WINDOW_EVENTS = ("window_loaded", "browser_opened")
+FIRST_PIXEL_EVENTS = ("splash_shown",)
+
+
+def read_events(path):
+    events = []
+    try:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    events.append(json.loads(line))
+                except ValueError:
+                    pass
+    except OSError:
+        pass
+    return events
+
+
+def first_event(events, names):
+    for event in events:
+        if event["event"] in names:
+            return event
+    return None
+
+
+def visible_window_pids():
+    # The bootloader splash is drawn before Python runs, so no timing event can mark it; on Windows we watch
+    # for the launched process owning a visible top-level window instead. Elsewhere this returns None.
+    if sys.platform != "win32":
+        return None
+    import ctypes
+    from ctypes import wintypes
+    user32 = ctypes.windll.user32
+    pids = set()
+
+    @ctypes.WINFUNCTYPE(wintypes.BOOL, wintypes.HWND, wintypes.LPARAM)
+    def callback(hwnd, _):
+        if user32.IsWindowVisible(hwnd):
+            pid = wintypes.DWORD()
+            user32.GetWindowThreadProcessId(hwnd, ctypes.byref(pid))
+            pids.add(pid.value)
+        return True
+
+    user32.EnumWindows(callback, 0)
+    return pids
+
+
+def measure_launch(exe_path, env_extra=None, timeout=60):
+    fd, timing_path = tempfile.mkstemp(prefix="web2exe_timing_", suffix=".jsonl")
+    os.close(fd)
+    env = dict(os.environ, WEB2EXE_TIMING_FILE=timing_path, WEB2EXE_TIMING_EXIT="1", **(env_extra or {}))
+    try:
+        started = time.time()
+        process = subprocess.Popen([exe_path], env=env)
+        deadline = started + timeout
+        window = None
+        first_pixel = None
+        while time.time() < deadline:
+            if first_pixel is None and process.pid in (visible_window_pids() or ()):
+                first_pixel = time.time()
+            window = first_event(read_events(timing_path), FIRST_WINDOW_EVENTS)
+            if window:
+                break
+            time.sleep(0.02)
+
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+
+        events = read_events(timing_path)
+        script_start = first_event(events, ("script_start",))
+        shown = first_event(events, FIRST_PIXEL_EVENTS + FIRST_WINDOW_EVENTS)
+        if shown and (first_pixel is None or shown["t"] < first_pixel):
+            first_pixel = shown["t"]
+        return {
+            "first_pixel": round(first_pixel - started, 3) if first_pixel else None,
+            "first_window": round(window["t"] - started, 3) if window else None,
+            "script_start": round(script_start["t"] - started, 3) if script_start else None,
+            "events": [(event["event"], round(event["t"] - started, 3)) for event in events],
+        }
+    finally:
+        os.remove(timing_path)
+
+
+def _median_window(samples):
+    values = [s["first_window"] for s in samples if s["first_window"] is not None]
+    return round(statistics.median(values), 3) if values else None
+
+
+def measure_startup(exe_path, runs=5, timeout=60):
+    app_cache = tempfile.mkdtemp(prefix="web2exe_appcache_")
+    env = {"WEB2EXE_APP_CACHE": app_cache, "WEB2EXE_WEBVIEW_DATA": os.path.join(app_cache, "webview")}
+    try:
+        samples = [measure_launch(exe_path, env, timeout) for _ in range(max(2, runs))]
+    finally:
+        shutil.rmtree(app_cache, ignore_errors=True)
+    warm = [s["first_window"] for s in samples[1:] if s["first_window"] is not None]
+    return {
+        "cold": samples[0]["first_window"],
+        "warm": round(statistics.median(warm), 3) if warm else None,
+        "samples": samples,
+    }
+
+
+def measure_storage(exe_path, runs=5, timeout=60):
+    # Cold: every launch gets an empty webview profile. Warm: launches share one profile primed by an extra run.
+    root = tempfile.mkdtemp(prefix="web2exe_webview_")
+    app_cache = os.path.join(root, "apps")
+    try:
+        cold = [measure_launch(exe_path, {"WEB2EXE_APP_CACHE": app_cache,
+                                          "WEB2EXE_WEBVIEW_DATA": os.path.join(root, f"cold-{n}")}, timeout)
+                for n in range(max(1, runs))]
+        shared = {"WEB2EXE_APP_CACHE": app_cache, "WEB2EXE_WEBVIEW_DATA": os.path.join(root, "warm")}
+        measure_launch(exe_path, shared, timeout)
+        warm = [measure_launch(exe_path, shared, timeout) for _ in range(max(1, runs))]
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+    return {"cold": _median_window(cold), "warm": _median_window(warm), "samples": cold + warm}
+
+
+def compare_storage(url, output_dir, runs=5, pyinstaller=None, mode="onedir", warmup="off", log=print):
+    jobs = [BuildJob(url, title=f"web2exe-storage-{name}", package_mode=mode, output_dir=output_dir,
+                     storage=name != "private", warmup=warmup, index=idx)
+            for idx, name in enumerate(("private", "storage"))]
+    engine = BuildEngine(pyinstaller=pyinstaller, use_cache=False, log=log)
+    report = {}
+    for result in engine.run(jobs):
+        name = "storage" if result.job.storage else "private"
+        if not result.success:
+            report[name] = {"error": result.error}
+            continue
+        exe_path = engine.main_executable(result.job, result.artifact)
+        log(f"正在测量 {name}: {exe_path}")
+        report[name] = measure_storage(exe_path, runs)
+    return report
+
+
+def compare_splash(url, splash_html, output_dir, runs=5, pyinstaller=None, mode="onefile", splash_image="",
+                   log=print):
+    jobs = [BuildJob(url, title=f"web2exe-splash-{name}", splash_html=splash_html, use_splash=True,
+                     boot_splash=name == "boot", splash_image=splash_image if name == "boot" else "",
+                     package_mode=mode, output_dir=output_dir, index=idx)
+            for idx, name in enumerate(("html", "boot"))]
+    engine = BuildEngine(pyinstaller=pyinstaller, use_cache=False, log=log)
+    report = {}
+    for result in engine.run(jobs):
+        name = "boot" if result.job.boot_splash else "html"
+        if not result.success:
+            report[name] = {"error": result.error}
+            continue
+        exe_path = engine.main_executable(result.job, result.artifact)
+        log(f"正在测量 {name}: {exe_path}")
+        app_cache = tempfile.mkdtemp(prefix="web2exe_appcache_")
+        try:
+            samples = [measure_launch(exe_path, {"WEB2EXE_APP_CACHE": app_cache}) for _ in range(max(1, runs))]
+        finally:
+            shutil.rmtree(app_cache, ignore_errors=True)
+        pixels = [s["first_pixel"] for s in samples if s["first_pixel"] is not None]
+        report[name] = {
+            "first_pixel": round(statistics.median(pixels), 3) if pixels else None,
+            "first_window": _median_window(samples),
+            "samples": samples,
+        }
+    return report
+
+
+def format_splash_report(report):
+    lines = [f"{'启动画面':<12}{'首次显示 (s)':>14}{'主窗口 (s)':>12}"]
+    for name, stats in report.items():
+        if "error" in stats:
+            lines.append(f"{name:<12}{'失败: ' + stats['error']}")
+            continue
+        pixel = "-" if stats["first_pixel"] is None else f"{stats['first_pixel']:.3f}"
+        window = "-" if stats["first_window"] is None else f"{stats['first_window']:.3f}"
+        lines.append(f"{name:<12}{pixel:>14}{window:>12}")
+    return "\n".join(lines)
+
+
+def compare_modes(url, output_dir, runs=5, use_webview=True, pyinstaller=None, modes=PACKAGE_MODES, log=print):
+    jobs = [BuildJob(url, title=f"web2exe-timing-{mode}", use_webview=use_webview, package_mode=mode,
+                     output_dir=output_dir, index=idx)
+            for idx, mode in enumerate(modes)]
+    engine = BuildEngine(pyinstaller=pyinstaller, use_cache=False, log=log)
+    report = {}
+    for result in engine.run(jobs):
+        mode = result.job.package_mode
+        if not result.success:
+            report[mode] = {"error": result.error}
+            continue
+        exe_path = engine.main_executable(result.job, result.artifact)
+        log(f"正在测量 {mode}: {exe_path}")
+        report[mode] = measure_startup(exe_path, runs)
+    return report
+
+
+def format_report(report, label="输出方式"):
+    lines = [f"{label:<12}{'冷启动 (s)':>12}{'热启动 (s)':>12}"]
+    for mode, stats in report.items():
+        if "error" in stats:
+            lines.append(f"{mode:<12}{'失败: ' + stats['error']}")
+            continue
+        cold = "-" if stats["cold"] is None else f"{stats['cold']:.3f}"
+        warm = "-" if stats["warm"] is None else f"{stats['warm']:.3f}"
+        lines.append(f"{mode:<12}{cold:>12}{warm:>12}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="测量生成程序从启动到第一个窗口的时间")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    measure = sub.add_parser("measure", help="测量已生成的程序")
+    measure.add_argument("exe", nargs="+")
+    measure.add_argument("--runs", type=int, default=5)
+    measure.add_argument("--timeout", type=int, default=60)
+
+    compare = sub.add_parser("compare", help="用每种输出方式打包同一网址并比较冷/热启动时间")
+    compare.add_argument("url")
+    compare.add_argument("-o", "--output", help="输出目录，默认使用临时目录")
+    compare.add_argument("--runs", type=int, default=5)
+    compare.add_argument("--browser", action="store_true")
+    compare.add_argument("--modes", nargs="+", choices=PACKAGE_MODES, default=list(PACKAGE_MODES))
+    compare.add_argument("--pyinstaller", default=None)
+    compare.add_argument("--report", help="将完整结果写入 JSON 文件")
+
+    storage = sub.add_parser("storage", help="比较不保留浏览器数据与保留数据目录时，空数据目录（冷）和已有缓存（热）的首屏时间")
+    storage.add_argument("url")
+    storage.add_argument("-o", "--output", help="输出目录，默认使用临时目录")
+    storage.add_argument("--runs", type=int, default=5)
+    storage.add_argument("--mode", choices=PACKAGE_MODES, default="onedir")
+    storage.add_argument("--warmup", choices=WARMUP_MODES, default="off")
+    storage.add_argument("--pyinstaller", default=None)
+    storage.add_argument("--report", help="将完整结果写入 JSON 文件")
+
+    splash = sub.add_parser("splash", help="比较 HTML 启动页与引导程序启动画面的首次显示时间和主窗口时间")
+    splash.add_argument("url")
+    splash.add_argument("splash_html")
+    splash.add_argument("--splash-image", default="", help="引导程序启动画面使用的图片，默认渲染启动页")
+    splash.add_argument("-o", "--output", help="输出目录，默认使用临时目录")
+    splash.add_argument("--runs", type=int, default=5)
+    splash.add_argument("--mode", choices=PACKAGE_MODES, default="onefile")
+    splash.add_argument("--pyinstaller", default=None)
+    splash.add_argument("--report", help="将完整结果写入 JSON 文件")
+
+    args = parser.parse_args(argv)
+    if args.command == "measure":
+        report = {exe: measure_startup(exe, args.runs, args.timeout) for exe in args.exe}
+        print(format_report(report))
+        return 0
+
+    output_dir = args.output or tempfile.mkdtemp(prefix="web2exe_compare_")
+    pyinstaller = shlex.split(args.pyinstaller) if args.pyinstaller else None
+    if args.command == "splash":
+        report = compare_splash(args.url, args.splash_html, output_dir, args.runs, pyinstaller, args.mode,
+                                args.splash_image)
+        print(format_splash_report(report))
+    elif args.command == "storage":
+        report = compare_storage(args.url, output_dir, args.runs, pyinstaller, args.mode, args.warmup)
+        print(format_report(report, "浏览器数据"))
+    else:
+        report = compare_modes(args.url, output_dir, args.runs, not args.browser, pyinstaller, args.modes)
+        print(format_report(report))
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,195 @@
+import os, threading
+import time
+
+from webexe_splash import resolve_assets
+from webexe_template import template_variant
+
+# Watch mode: poll the form or manifest, the splash page with its assets, and the icon files. Once changes have
+# settled for DEBOUNCE seconds, only the changed jobs are rebuilt, each with the cheapest step that covers the
+# change. A newer change cancels the build still in progress.
+
+DEFAULT_DEBOUNCE = 0.8
+POLL_INTERVAL = 0.5
+
+STAMP = "stamp"
+BUNDLE = "bundle"
+REBUILD = "rebuild"
+LEVEL_NAMES = {STAMP: "写入配置", BUNDLE: "更新启动页资源", REBUILD: "重新打包"}
+
+
+def file_stamp(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def splash_files(job):
+    if not (job.has_splash or (job.has_boot_splash and not job.splash_image)):
+        return []
+    html_path = os.path.abspath(job.splash_html)
+    try:
+        return [html_path] + resolve_assets(html_path)[1]
+    except OSError:
+        return [html_path]
+
+
+def job_state(job):
+    return {
+        "fields": job.to_dict(),
+        "icon": file_stamp(job.icon) if job.icon else None,
+        "splash_image": file_stamp(job.splash_image) if job.splash_image else None,
+        "splash": {path: file_stamp(path) for path in splash_files(job)},
+    }
+
+
+def change_level(engine, built, job, state):
+    if built is None:
+        return REBUILD
+    old_job, old_state, artifact = built
+    if state == old_state:
+        return None
+    if (engine.template_eligible(job) and engine.template_eligible(old_job)
+            and template_variant(job) == template_variant(old_job)):
+        # Config, icon, version info and the splash archive are all written when a template is stamped.
+        return STAMP
+    if any(state[key] != old_state[key] for key in ("fields", "icon", "splash_image")):
+        return REBUILD
+    if job.package_mode == "onedir" and job.has_splash and os.path.isdir(artifact):
+        return BUNDLE
+    return REBUILD
+
+
+class Watcher:
+    # update() only hands the job list over; the poll thread reads the splash files, debounces and cancels a
+    # running build (taskkill on Windows can take a while), so callers such as the Tk loop never block.
+    def __init__(self, engine, debounce=DEFAULT_DEBOUNCE, log=None):
+        self.engine = engine
+        self.debounce = debounce
+        self.log = log or engine.log
+        self.preflight = engine.preflight
+        self._seen = None
+        self._changed_at = 0.0
+        self._issued = None
+        self._built = {}
+        self._latest = None
+        self._pending = None
+        self._building = False
+        self._stopped = False
+        self._cond = threading.Condition()
+        self._poll_thread = threading.Thread(target=self._poll_loop, name="web2exe-watch-poll", daemon=True)
+        self._thread = threading.Thread(target=self._build_loop, name="web2exe-watch", daemon=True)
+        self._poll_thread.start()
+        self._thread.start()
+
+    def update(self, jobs):
+        with self._cond:
+            self._latest = jobs
+            self._cond.notify_all()
+
+    def stop(self, wait=True):
+        with self._cond:
+            self._stopped = True
+            self._latest = None
+            self._pending = None
+            self._cond.notify_all()
+        if wait:
+            self._poll_thread.join()
+            self._thread.join()
+
+    def _poll_loop(self):
+        while True:
+            with self._cond:
+                while self._latest is None and not self._stopped:
+                    self._cond.wait()
+                if self._stopped:
+                    building = self._building
+                    break
+                jobs = self._latest
+                self._latest = None
+            try:
+                self._check(jobs)
+            except Exception as e:
+                self.log(f"监视模式检查修改出错：{e}")
+        if building:
+            self.engine.cancel()
+
+    def _check(self, jobs):
+        states = {job.index: job_state(job) for job in jobs}
+        if states != self._seen:
+            self._seen = states
+            self._changed_at = time.time()
+            return
+        if states == self._issued or time.time() - self._changed_at < self.debounce:
+            return
+        self._issued = states
+        with self._cond:
+            if self._stopped:
+                return
+            self._pending = (jobs, states)
+            building = self._building
+            self._cond.notify_all()
+        if building:
+            self.log("--- 检测到新的修改，取消正在进行的打包 ---")
+            self.engine.cancel()
+
+    def _build_loop(self):
+        while True:
+            with self._cond:
+                while self._pending is None and not self._stopped:
+                    self._cond.wait()
+                if self._stopped:
+                    return
+                jobs, states = self._pending
+                self._pending = None
+                self._building = True
+            try:
+                self._build(jobs, states)
+            except Exception as e:
+                self.log(f"监视模式打包出错：{e}")
+            finally:
+                with self._cond:
+                    self._building = False
+
+    def _build(self, jobs, states):
+        levels = {}
+        for job in jobs:
+            level = change_level(self.engine, self._built.get(job.index), job, states[job.index])
+            if level:
+                levels[job.index] = level
+        if not levels:
+            self.log("--- 修改不影响打包结果 ---")
+            return
+        self.log("--- 检测到修改：" + "，".join(f"{job.title}（{LEVEL_NAMES[levels[job.index]]}）"
+                                         for job in jobs if job.index in levels) + " ---")
+        # URLs are only checked again when they changed.
+        self.engine.preflight = self.preflight and any(
+            job.index not in self._built or self._built[job.index][0].urls != job.urls
+            for job in jobs if job.index in levels)
+        plan = {index: "bundle" if level == BUNDLE else "build" for index, level in levels.items()}
+        for result in self.engine.run(jobs, plan):
+            if result.success:
+                self._built[result.job.index] = (result.job, states[result.job.index], result.artifact)
+
+
+def watch(load_jobs, watcher, interval=POLL_INTERVAL):
+    # load_jobs re-reads the job list; OSError/ValueError (e.g. a manifest saved halfway) skip one poll.
+    last_error = None
+    watcher.log(f"--- 监视模式：修改稳定 {watcher.debounce}s 后自动重新打包，按 Ctrl+C 停止 ---")
+    try:
+        while True:
+            try:
+                jobs = load_jobs()
+            except (OSError, ValueError) as e:
+                if str(e) != last_error:
+                    watcher.log(f"错误：{e}")
+                    last_error = str(e)
+            else:
+                last_error = None
+                watcher.update(jobs)
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        watcher.log("--- 已停止监视 ---")
+    finally:
+        watcher.stop()